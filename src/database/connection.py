@@ -1,7 +1,10 @@
 """
 Database connection manager for VendorVault.
 Provides thread-safe database connections and context manager support.
+Reads are served from a pool of read-only connections; writes go through a
+single writer connection, matching SQLite's one-writer/many-readers WAL model.
 """
+import queue
 import sqlite3
 import threading
 from contextlib import contextmanager
@@ -15,6 +18,25 @@ class DatabaseConnection:
     _instance: Optional['DatabaseConnection'] = None
     _lock = threading.Lock()
     
+    # sqlite3 keeps this many compiled statements per connection, keyed by SQL text.
+    # Services keep their SQL in class constants, so repeated calls reuse the
+    # compiled statement and skip parsing and planning.
+    STATEMENT_CACHE_SIZE = 512
+    
+    # Idle read-only connections kept open for reuse
+    READER_POOL_SIZE = 4
+    
+    # Per-connection tuning: billing writes and dashboard reads run concurrently.
+    # foreign_keys stays off: pending_bills references employee(employee_id), which
+    # is not a key of employee, so enforcement would reject every pending-bill insert.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA busy_timeout=5000",
+    )
+    
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
@@ -25,24 +47,47 @@ class DatabaseConnection:
     def __init__(self):
         if not hasattr(self, 'initialized'):
             self.db_path = config.get_database_path()
+            self._wal_enabled = False
+            self._readers: queue.Queue = queue.Queue(maxsize=self.READER_POOL_SIZE)
+            self._writer: Optional[sqlite3.Connection] = None
+            self._writer_lock = threading.RLock()
+            self._writer_depth = 0
+            # Bumped on every committed write so read caches can tell their data is stale
+            self.write_version = 0
             self.initialized = True
     
-    def get_connection(self) -> sqlite3.Connection:
+    def get_connection(self, read_only: bool = False) -> sqlite3.Connection:
         """
         Get a new database connection.
         
+        Args:
+            read_only: Open the connection with PRAGMA query_only
+        
         Returns:
             sqlite3.Connection: Database connection object
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(
+            self.db_path, cached_statements=self.STATEMENT_CACHE_SIZE, check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row  # Enable column access by name
+        
+        # WAL is persistent in the database file, so it only needs to be set once
+        if not self._wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
         return conn
     
     @contextmanager
     def get_cursor(self):
         """
-        Context manager for database operations.
+        Context manager for database operations on the writer connection.
         Automatically commits on success and rolls back on error.
+        Nested use joins the outer transaction, which commits once at the end.
         
         Usage:
             with db.get_cursor() as cursor:
@@ -52,17 +97,49 @@ class DatabaseConnection:
         Yields:
             sqlite3.Cursor: Database cursor
         """
-        conn = self.get_connection()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self.get_connection()
+            conn = self._writer
+            cursor = conn.cursor()
+            self._writer_depth += 1
+            try:
+                yield cursor
+                if self._writer_depth == 1:
+                    conn.commit()
+                    self.write_version += 1
+            except Exception as e:
+                if self._writer_depth == 1:
+                    conn.rollback()
+                raise e
+            finally:
+                self._writer_depth -= 1
+                cursor.close()
+    
+    @contextmanager
+    def get_read_cursor(self):
+        """
+        Context manager for read-only queries on a pooled connection.
+        
+        Yields:
+            sqlite3.Cursor: Cursor on a connection opened with PRAGMA query_only
+        """
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self.get_connection(read_only=True)
         cursor = conn.cursor()
         try:
             yield cursor
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
         finally:
             cursor.close()
-            conn.close()
+            # Never pool a connection holding an open (stale) read transaction
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
     
     def execute_query(self, query: str, params: tuple = ()) -> list:
         """
@@ -75,12 +152,52 @@ class DatabaseConnection:
         Returns:
             list: Query results as dicts (supports .get() method)
         """
-        with self.get_cursor() as cursor:
+        with self.get_read_cursor() as cursor:
             cursor.execute(query, params)
             rows = cursor.fetchall()
             # Convert sqlite3.Row to dict for .get() support
             return [dict(row) for row in rows]
     
+    def execute_query_rows(self, query: str, params: tuple = ()) -> list:
+        """
+        Execute a SELECT query and return results as plain tuples.
+        Skips building sqlite3.Row and dict objects, for bulk loads that
+        unpack rows positionally.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+        
+        Returns:
+            list: Query results as tuples in SELECT column order
+        """
+        with self.get_read_cursor() as cursor:
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            return cursor.fetchall()
+    
+    def iter_query(self, query: str, params: tuple = (), batch_size: int = 1000):
+        """
+        Execute a SELECT query and stream the results.
+        Rows are fetched from the cursor in batches so large result sets
+        are never materialized in memory at once.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            batch_size: Number of rows fetched per round-trip
+        
+        Yields:
+            sqlite3.Row: Result rows (support column access by name)
+        """
+        with self.get_read_cursor() as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
         Execute an INSERT, UPDATE, or DELETE query.
@@ -3,6 +3,7 @@ Database migration utilities.
 Handles schema updates while preserving existing data.
 """
 import sqlite3
+import json
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +15,30 @@ logger = logging.getLogger(__name__)
 class DatabaseMigration:
     """Handles database migrations."""
     
+    # One products_denorm row per active product: its default variant and stock
+    PRODUCTS_DENORM_SELECT = """
+        SELECT
+            p.product_id,
+            p.product_code,
+            p.product_name,
+            pt.type_name,
+            b.brand_name,
+            p.base_unit,
+            pv.variant_id,
+            pv.sku,
+            pv.mrp,
+            (SELECT SUM(i.stock_quantity) FROM inventory i WHERE i.variant_id = pv.variant_id)
+        FROM products p
+        JOIN brands b ON p.brand_id = b.brand_id
+        JOIN product_types pt ON p.product_type_id = pt.product_type_id
+        LEFT JOIN product_variants pv ON pv.variant_id = (
+            SELECT variant_id FROM product_variants
+            WHERE product_id = p.product_id AND is_default = 1
+            ORDER BY variant_id LIMIT 1
+        )
+        WHERE p.is_active = 1 AND {where}
+    """
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
     
@@ -43,6 +68,21 @@ class DatabaseMigration:
             # Create analytics SQL views (2026 Enterprise Analytics)
             self._create_analytics_views(cursor)
             
+            # Create trigger-maintained daily sales rollup
+            self._create_daily_sales_table(cursor)
+            
+            # Create normalized bill line items
+            self._create_bill_lines_table(cursor)
+            
+            # Create trigger-maintained denormalized product catalogue
+            self._create_products_denorm_table(cursor)
+            
+            # Create full-text index over the catalogue for product search
+            self._create_products_fts_table(cursor)
+            
+            # Create per-type product code counters
+            self._create_code_sequences_table(cursor)
+            
             conn.commit()
             logger.info("Database migrations completed successfully.")
             
@@ -175,6 +215,7 @@ class DatabaseMigration:
             ("idx_bill_customer", config.TABLE_BILL, "customer_name"),
             ("idx_product_name", config.TABLE_RAW_INVENTORY, "product_name"),
             ("idx_product_cat", config.TABLE_RAW_INVENTORY, "product_cat"),
+            ("idx_employee_role", config.TABLE_EMPLOYEE, "role"),
         ]
         
         # 2026 Speed optimization indexes
@@ -186,6 +227,11 @@ class DatabaseMigration:
             "CREATE INDEX IF NOT EXISTS idx_inventory_lookup ON inventory(variant_id, stock_quantity)",
             "CREATE INDEX IF NOT EXISTS idx_bill_employee ON bills(employee_id, bill_date)",
             "CREATE INDEX IF NOT EXISTS idx_brand_name ON brands(brand_name)",
+            # Covering indexes: default-variant lookups and stock valuation read only index pages
+            "CREATE INDEX IF NOT EXISTS idx_variant_default_cover ON product_variants(product_id, is_default, variant_id, mrp, cost_price, sku)",
+            "CREATE INDEX IF NOT EXISTS idx_product_type_active ON product_types(is_active, display_order, type_name)",
+            # Quick-access products are read in this order, so no sort runs per call
+            "CREATE INDEX IF NOT EXISTS idx_simple_active_stock ON simple_products(is_active, stock DESC, name)",
         ]
         
         for index_name, table, column in indexes:
@@ -243,6 +289,350 @@ class DatabaseMigration:
             
         except Exception as e:
             logger.warning(f"Could not create analytics views: {e}")
+    
+    def _create_daily_sales_table(self, cursor):
+        """
+        Create the daily_sales rollup table and the triggers that keep it in sync with bill.
+        KPI and trend queries read one narrow row per day instead of scanning bills.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_sales'"
+        )
+        is_new = cursor.fetchone() is None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_sales (
+                sale_date TEXT PRIMARY KEY,
+                bill_count INTEGER NOT NULL DEFAULT 0,
+                subtotal REAL NOT NULL DEFAULT 0,
+                discount REAL NOT NULL DEFAULT 0,
+                tax_amount REAL NOT NULL DEFAULT 0,
+                revenue REAL NOT NULL DEFAULT 0
+            )
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_daily_sales_insert
+            AFTER INSERT ON {config.TABLE_BILL}
+            BEGIN
+                INSERT INTO daily_sales (sale_date, bill_count, subtotal, discount, tax_amount, revenue)
+                VALUES (
+                    date(NEW.date), 1, COALESCE(NEW.subtotal, 0), COALESCE(NEW.discount, 0),
+                    COALESCE(NEW.tax_amount, 0), COALESCE(NEW.total, 0)
+                )
+                ON CONFLICT(sale_date) DO UPDATE SET
+                    bill_count = bill_count + 1,
+                    subtotal = subtotal + excluded.subtotal,
+                    discount = discount + excluded.discount,
+                    tax_amount = tax_amount + excluded.tax_amount,
+                    revenue = revenue + excluded.revenue;
+            END
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_daily_sales_delete
+            AFTER DELETE ON {config.TABLE_BILL}
+            BEGIN
+                UPDATE daily_sales SET
+                    bill_count = bill_count - 1,
+                    subtotal = subtotal - COALESCE(OLD.subtotal, 0),
+                    discount = discount - COALESCE(OLD.discount, 0),
+                    tax_amount = tax_amount - COALESCE(OLD.tax_amount, 0),
+                    revenue = revenue - COALESCE(OLD.total, 0)
+                WHERE sale_date = date(OLD.date);
+            END
+        """)
+        
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_daily_sales_update
+            AFTER UPDATE OF date, subtotal, discount, tax_amount, total ON {config.TABLE_BILL}
+            BEGIN
+                UPDATE daily_sales SET
+                    bill_count = bill_count - 1,
+                    subtotal = subtotal - COALESCE(OLD.subtotal, 0),
+                    discount = discount - COALESCE(OLD.discount, 0),
+                    tax_amount = tax_amount - COALESCE(OLD.tax_amount, 0),
+                    revenue = revenue - COALESCE(OLD.total, 0)
+                WHERE sale_date = date(OLD.date);
+                
+                INSERT INTO daily_sales (sale_date, bill_count, subtotal, discount, tax_amount, revenue)
+                VALUES (
+                    date(NEW.date), 1, COALESCE(NEW.subtotal, 0), COALESCE(NEW.discount, 0),
+                    COALESCE(NEW.tax_amount, 0), COALESCE(NEW.total, 0)
+                )
+                ON CONFLICT(sale_date) DO UPDATE SET
+                    bill_count = bill_count + 1,
+                    subtotal = subtotal + excluded.subtotal,
+                    discount = discount + excluded.discount,
+                    tax_amount = tax_amount + excluded.tax_amount,
+                    revenue = revenue + excluded.revenue;
+            END
+        """)
+        
+        # Backfill from existing bills the first time the rollup is created
+        if is_new:
+            cursor.execute(f"""
+                INSERT INTO daily_sales (sale_date, bill_count, subtotal, discount, tax_amount, revenue)
+                SELECT date(date), COUNT(*), COALESCE(SUM(subtotal), 0), COALESCE(SUM(discount), 0),
+                       COALESCE(SUM(tax_amount), 0), COALESCE(SUM(total), 0)
+                FROM {config.TABLE_BILL}
+                GROUP BY date(date)
+            """)
+        
+        logger.info("Daily sales rollup table created/verified.")
+    
+    def _create_bill_lines_table(self, cursor):
+        """
+        Create the normalized bill_lines table (one row per bill line, keyed by bill_no).
+        This is separate from the older bill_items table, which is keyed by bill_id
+        and is not written by the app.
+        Existing bills are backfilled from their bill_details / bill_variants_json text.
+        """
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('bill_lines', 'bill_item')"
+        )
+        tables = {row[0] for row in cursor.fetchall()}
+        if tables == {'bill_item'}:
+            # Databases migrated while the table was called bill_item keep their rows
+            cursor.execute("ALTER TABLE bill_item RENAME TO bill_lines")
+            cursor.execute("DROP INDEX IF EXISTS idx_bill_item_product")
+            cursor.execute("DROP INDEX IF EXISTS idx_bill_item_bill")
+        is_new = not tables
+        
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS bill_lines (
+                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                bill_no TEXT NOT NULL,
+                product_name TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price REAL NOT NULL,
+                FOREIGN KEY (bill_no) REFERENCES {config.TABLE_BILL}(bill_no)
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bill_lines_product ON bill_lines(product_name, bill_no)"
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_bill_lines_bill ON bill_lines(bill_no)")
+        
+        if is_new:
+            cursor.execute(
+                f"SELECT bill_no, bill_details, bill_variants_json FROM {config.TABLE_BILL}"
+            )
+            items = [
+                (bill_no, *item)
+                for bill_no, details, variants_json in cursor.fetchall()
+                for item in self._parse_bill_items(details, variants_json)
+            ]
+            cursor.executemany(
+                "INSERT INTO bill_lines (bill_no, product_name, quantity, unit_price) VALUES (?, ?, ?, ?)",
+                items
+            )
+            logger.info(f"Backfilled {len(items)} bill lines.")
+        
+        logger.info("Bill lines table created/verified.")
+    
+    def _create_products_denorm_table(self, cursor):
+        """
+        Create the products_denorm table and the triggers that keep it in sync.
+        Catalogue reads hit one indexed table instead of joining products,
+        brands, product_types, product_variants and inventory on every call.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_denorm'"
+        )
+        is_new = cursor.fetchone() is None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS products_denorm (
+                product_id INTEGER PRIMARY KEY,
+                product_code TEXT,
+                product_name TEXT NOT NULL,
+                product_cat TEXT,
+                brand_name TEXT,
+                base_unit TEXT,
+                variant_id INTEGER,
+                sku TEXT,
+                mrp REAL,
+                stock REAL
+            )
+        """)
+        
+        # Searchable fields joined into one value so substring search is a single LIKE.
+        # Fields are separated by a newline, which a search box cannot contain, so a
+        # term never matches across two fields. table_xinfo also lists generated columns.
+        cursor.execute("PRAGMA table_xinfo(products_denorm)")
+        if 'search_blob' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("""
+                ALTER TABLE products_denorm ADD COLUMN search_blob TEXT
+                GENERATED ALWAYS AS (
+                    lower(product_name || char(10) || COALESCE(product_code, '') || char(10) || COALESCE(sku, ''))
+                ) VIRTUAL
+            """)
+            logger.info("Added 'search_blob' column to products_denorm.")
+        
+        for column in ("product_name", "product_cat", "stock", "product_code", "sku"):
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_products_denorm_{column} ON products_denorm({column})"
+            )
+        
+        # (trigger name, event, products filter identifying the rows to refresh)
+        triggers = [
+            ("products_insert", "INSERT ON products", "p.product_id = NEW.product_id"),
+            ("products_update", "UPDATE ON products", "p.product_id IN (OLD.product_id, NEW.product_id)"),
+            ("variants_insert", "INSERT ON product_variants", "p.product_id = NEW.product_id"),
+            ("variants_update", "UPDATE ON product_variants", "p.product_id IN (OLD.product_id, NEW.product_id)"),
+            ("variants_delete", "DELETE ON product_variants", "p.product_id = OLD.product_id"),
+            ("inventory_insert", "INSERT ON inventory",
+             "p.product_id = (SELECT product_id FROM product_variants WHERE variant_id = NEW.variant_id)"),
+            ("inventory_update", "UPDATE OF variant_id, stock_quantity ON inventory",
+             "p.product_id IN (SELECT product_id FROM product_variants "
+             "WHERE variant_id IN (OLD.variant_id, NEW.variant_id))"),
+            ("inventory_delete", "DELETE ON inventory",
+             "p.product_id = (SELECT product_id FROM product_variants WHERE variant_id = OLD.variant_id)"),
+            ("brands_update", "UPDATE OF brand_name ON brands", "p.brand_id = NEW.brand_id"),
+            ("brands_delete", "DELETE ON brands", "p.brand_id = OLD.brand_id"),
+            ("types_update", "UPDATE OF type_name ON product_types", "p.product_type_id = NEW.product_type_id"),
+            ("types_delete", "DELETE ON product_types", "p.product_type_id = OLD.product_type_id"),
+        ]
+        for name, event, where in triggers:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_products_denorm_{name}
+                AFTER {event}
+                BEGIN
+                    DELETE FROM products_denorm
+                    WHERE product_id IN (SELECT p.product_id FROM products p WHERE {where});
+                    INSERT OR REPLACE INTO products_denorm {self.PRODUCTS_DENORM_SELECT.format(where=where)};
+                END
+            """)
+        
+        # Deleted products no longer match any products filter, so drop them by id
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_denorm_products_delete
+            AFTER DELETE ON products
+            BEGIN
+                DELETE FROM products_denorm WHERE product_id = OLD.product_id;
+            END
+        """)
+        
+        # Backfill from the catalogue the first time the table is created
+        if is_new:
+            cursor.execute(
+                f"INSERT INTO products_denorm {self.PRODUCTS_DENORM_SELECT.format(where='1 = 1')}"
+            )
+        
+        logger.info("Denormalized products table created/verified.")
+    
+    def _create_products_fts_table(self, cursor):
+        """
+        Create the products_fts full-text index over products_denorm.
+        The trigram tokenizer keeps substring matching equivalent to LIKE '%term%'.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+        )
+        is_new = cursor.fetchone() is None
+        
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    product_name, product_code, sku,
+                    content='products_denorm', content_rowid='product_id',
+                    tokenize='trigram'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            # Older SQLite builds lack FTS5 or the trigram tokenizer; search falls back to LIKE
+            logger.warning(f"Could not create products_fts: {e}")
+            return
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_fts_insert
+            AFTER INSERT ON products_denorm
+            BEGIN
+                INSERT INTO products_fts (rowid, product_name, product_code, sku)
+                VALUES (NEW.product_id, NEW.product_name, NEW.product_code, NEW.sku);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_fts_delete
+            AFTER DELETE ON products_denorm
+            BEGIN
+                INSERT INTO products_fts (products_fts, rowid, product_name, product_code, sku)
+                VALUES ('delete', OLD.product_id, OLD.product_name, OLD.product_code, OLD.sku);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_products_fts_update
+            AFTER UPDATE ON products_denorm
+            BEGIN
+                INSERT INTO products_fts (products_fts, rowid, product_name, product_code, sku)
+                VALUES ('delete', OLD.product_id, OLD.product_name, OLD.product_code, OLD.sku);
+                INSERT INTO products_fts (rowid, product_name, product_code, sku)
+                VALUES (NEW.product_id, NEW.product_name, NEW.product_code, NEW.sku);
+            END
+        """)
+        
+        # Index the existing catalogue the first time the table is created
+        if is_new:
+            cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+        
+        logger.info("Product full-text index created/verified.")
+    
+    def _create_code_sequences_table(self, cursor):
+        """
+        Create the code_sequences table holding the last product code number per type.
+        Seeded from the current product counts so existing numbering carries on.
+        """
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'code_sequences'"
+        )
+        is_new = cursor.fetchone() is None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS code_sequences (
+                product_type_id INTEGER PRIMARY KEY,
+                last_sequence INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        if is_new:
+            cursor.execute("""
+                INSERT INTO code_sequences (product_type_id, last_sequence)
+                SELECT product_type_id, COUNT(*) FROM products GROUP BY product_type_id
+            """)
+        
+        logger.info("Product code sequences table created/verified.")
+    
+    @staticmethod
+    def _parse_bill_items(bill_details: str, variants_json: str) -> list:
+        """
+        Parse legacy bill item text into (product_name, quantity, unit_price) tuples.
+        bill_details lines are tab-separated: name, quantity, line total.
+        """
+        if variants_json:
+            try:
+                return [
+                    (item.get('product_name', 'Unknown'), item.get('quantity', 0),
+                     item.get('unit_price', 0))
+                    for item in json.loads(variants_json)
+                ]
+            except (json.JSONDecodeError, TypeError, AttributeError):
+                pass
+        
+        items = []
+        for line in (bill_details or '').split('\n'):
+            parts = [p.strip() for p in line.split('\t') if p.strip()]
+            if len(parts) >= 3:
+                try:
+                    quantity = int(parts[1])
+                    line_total = float(parts[2])
+                except ValueError:
+                    continue
+                unit_price = line_total / quantity if quantity else 0.0
+                items.append((parts[0], quantity, unit_price))
+        return items
 
 
 def run_migrations():
@@ -0,0 +1,41 @@
+"""
+Vectorized numeric kernels for the analytics engine.
+Keeps the hot per-product rollups in NumPy instead of Python dict loops.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def group_codes(labels: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map labels to small-integer group codes.
+
+    Missing labels (None/NaN) are grouped under '' so that every code is a
+    valid index; pandas would otherwise encode them as -1.
+
+    Args:
+        labels: Sequence of hashable labels (e.g. product names)
+
+    Returns:
+        Tuple of (codes as int64 array, unique labels indexed by code)
+    """
+    categorical = pd.Categorical(pd.Series(labels, dtype=object).fillna(''))
+    return categorical.codes.astype(np.int64), np.asarray(categorical.categories, dtype=object)
+
+
+def groupby_sum(keys: np.ndarray, vals: np.ndarray, nkeys: int) -> np.ndarray:
+    """
+    Sum values per integer group code in a single pass.
+
+    Args:
+        keys: Group codes in the range [0, nkeys)
+        vals: Values aligned with keys
+        nkeys: Number of groups
+
+    Returns:
+        np.ndarray: float64 array of length nkeys with per-group sums
+    """
+    return np.bincount(keys, weights=vals, minlength=nkeys)
+
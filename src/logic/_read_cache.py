@@ -0,0 +1,38 @@
+"""
+Per-service read cache for repeated dashboard queries.
+Entries are tied to DatabaseConnection.write_version, so any committed write
+through the shared connection invalidates them.
+"""
+from functools import wraps
+import time
+
+
+def cached_read(method):
+    """
+    Cache a service read per arguments.
+    
+    The service class provides the storage and limits: _read_cache (a dict
+    shared by its instances), CACHE_TTL in seconds and CACHE_MAX_ENTRIES.
+    Entries are dropped after any write through DatabaseConnection or after
+    CACHE_TTL seconds, whichever comes first.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        # Read before the query, so a write landing during it leaves the entry stale
+        version = self.db.write_version
+        entry = self._read_cache.pop(key, None)
+        if entry and entry[0] == version and now - entry[1] < self.CACHE_TTL:
+            # Re-inserted below so the dict stays in least-recently-used order
+            cached_at, value = entry[1], entry[2]
+        else:
+            cached_at, value = now, method(self, *args, **kwargs)
+            if len(self._read_cache) >= self.CACHE_MAX_ENTRIES:
+                self._read_cache.pop(next(iter(self._read_cache)), None)
+        self._read_cache[key] = (version, cached_at, value)
+        # Hand out copies of lists and dicts so callers cannot change the cached value
+        if isinstance(value, (list, dict)):
+            return value.copy()
+        return value
+    return wrapper
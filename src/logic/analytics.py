@@ -3,14 +3,19 @@ Analytics and reporting business logic.
 """
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple
-from collections import defaultdict
 import config
 from src.database.connection import db
+from src.logic._read_cache import cached_read
 
 
 class AnalyticsService:
     """Service class for analytics and reporting."""
     
+    # Read cache shared by all instances: (method, args) -> (write_version, time, value)
+    CACHE_TTL = 300.0
+    CACHE_MAX_ENTRIES = 64
+    _read_cache: Dict[tuple, tuple] = {}
+    
     def __init__(self):
         self.db = db
     
@@ -43,6 +48,7 @@ class AnalyticsService:
         
         return items
     
+    @cached_read
     def get_best_selling_products(self, start_date: str = None, end_date: str = None, 
                                   limit: int = 5) -> List[Dict]:
         """
@@ -56,38 +62,26 @@ class AnalyticsService:
         Returns:
             List of dictionaries with product info and quantity sold
         """
-        query = "SELECT bill_details FROM bill WHERE 1=1"
+        query = """
+            SELECT bi.product_name, SUM(bi.quantity) as quantity_sold
+            FROM bill b
+            JOIN bill_lines bi ON bi.bill_no = b.bill_no
+            WHERE 1=1
+        """
         params = []
         
         if start_date:
-            query += " AND date >= ?"
+            query += " AND b.date >= ?"
             params.append(start_date)
         
         if end_date:
-            query += " AND date <= ?"
+            query += " AND b.date <= ?"
             params.append(end_date)
         
-        results = self.db.execute_query(query, tuple(params))
-        
-        # Aggregate product quantities
-        product_quantities = defaultdict(int)
-        
-        for row in results:
-            items = self.parse_bill_details(row['bill_details'])
-            for product_name, quantity, _ in items:
-                product_quantities[product_name] += quantity
+        query += " GROUP BY bi.product_name ORDER BY quantity_sold DESC LIMIT ?"
+        params.append(limit)
         
-        # Sort and get top products
-        sorted_products = sorted(
-            product_quantities.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:limit]
-        
-        return [
-            {'product_name': name, 'quantity_sold': qty}
-            for name, qty in sorted_products
-        ]
+        return self.db.execute_query(query, tuple(params))
     
     def get_best_selling_today(self, limit: int = 5) -> List[Dict]:
         """Get best-selling products for today."""
@@ -108,6 +102,7 @@ class AnalyticsService:
         year_end = today.strftime("%Y-%m-%d")
         return self.get_best_selling_products(year_start, year_end, limit)
     
+    @cached_read
     def calculate_profit_by_product(self, start_date: str = None, end_date: str = None) -> List[Dict]:
         """
         Calculate profit by product for a date range.
@@ -119,19 +114,25 @@ class AnalyticsService:
         Returns:
             List of dictionaries with product and profit info
         """
-        # Get bills
-        bill_query = "SELECT bill_details FROM bill WHERE 1=1"
+        # Get quantity sold per product
+        sales_query = """
+            SELECT bi.product_name, SUM(bi.quantity) as quantity
+            FROM bill b
+            JOIN bill_lines bi ON bi.bill_no = b.bill_no
+            WHERE 1=1
+        """
         params = []
         
         if start_date:
-            bill_query += " AND date >= ?"
+            sales_query += " AND b.date >= ?"
             params.append(start_date)
         
         if end_date:
-            bill_query += " AND date <= ?"
+            sales_query += " AND b.date <= ?"
             params.append(end_date)
         
-        bills = self.db.execute_query(bill_query, tuple(params))
+        sales_query += " GROUP BY bi.product_name"
+        sales = self.db.execute_query(sales_query, tuple(params))
         
         # Get product cost prices
         product_query = "SELECT product_name, cost_price, mrp FROM raw_inventory"
@@ -145,27 +146,17 @@ class AnalyticsService:
             mrp_prices[product['product_name']] = product['mrp'] or 0
         
         # Calculate profit per product
-        product_profits = defaultdict(lambda: {'quantity': 0, 'profit': 0.0})
-        
-        for bill in bills:
-            items = self.parse_bill_details(bill['bill_details'])
-            for product_name, quantity, _ in items:
-                cost = cost_prices.get(product_name, 0)
-                mrp = mrp_prices.get(product_name, 0)
-                profit = (mrp - cost) * quantity
-                
-                product_profits[product_name]['quantity'] += quantity
-                product_profits[product_name]['profit'] += profit
-        
-        # Convert to list and sort by profit
-        result = [
-            {
-                'product_name': name,
-                'quantity': data['quantity'],
-                'profit': data['profit']
-            }
-            for name, data in product_profits.items()
-        ]
+        result = []
+        for row in sales:
+            product_name = row['product_name']
+            quantity = row['quantity']
+            cost = cost_prices.get(product_name, 0)
+            mrp = mrp_prices.get(product_name, 0)
+            result.append({
+                'product_name': product_name,
+                'quantity': quantity,
+                'profit': (mrp - cost) * quantity
+            })
         
         result.sort(key=lambda x: x['profit'], reverse=True)
         return result
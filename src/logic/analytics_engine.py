@@ -9,14 +9,23 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from functools import lru_cache
 from collections import defaultdict
-import json
 import logging
 
 from src.database.connection import db
+from src.logic._fast import group_codes, groupby_sum
 
 logger = logging.getLogger(__name__)
 
 
+def _frame_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    Convert a DataFrame to a list of row dicts for the dashboard widgets.
+    Builds rows column-wise instead of going through to_dict('records').
+    """
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in zip(*(df[col].tolist() for col in columns))]
+
+
 # =============================================================================
 # DATE RANGE UTILITIES
 # =============================================================================
@@ -45,7 +54,16 @@ class DateRange:
         Returns:
             Tuple of (start_date, end_date) as strings
         """
-        today = datetime.now().date()
+        # Key the cache on today's date so relative presets roll over at midnight
+        today_ordinal = datetime.now().date().toordinal()
+        return DateRange._cached_date_bounds(preset, custom_start, custom_end, today_ordinal)
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _cached_date_bounds(preset: str, custom_start: Optional[str], custom_end: Optional[str],
+                            today_ordinal: int) -> Tuple[str, str]:
+        """Compute date bounds for a preset relative to the given day (memoized)."""
+        today = datetime.fromordinal(today_ordinal).date()
         end_date = today.strftime("%Y-%m-%d")
         
         if preset == DateRange.PRESET_7D:
@@ -157,13 +175,13 @@ class SalesAnalytics:
         """Get sales summary for a date range."""
         query = """
             SELECT 
-                COUNT(*) as bill_count,
-                COALESCE(SUM(total), 0) as total_revenue,
-                COALESCE(AVG(total), 0) as avg_order_value,
+                COALESCE(SUM(bill_count), 0) as bill_count,
+                COALESCE(SUM(revenue), 0) as total_revenue,
+                COALESCE(SUM(revenue) / NULLIF(SUM(bill_count), 0), 0) as avg_order_value,
                 COALESCE(SUM(tax_amount), 0) as total_tax,
                 COALESCE(SUM(discount), 0) as total_discount
-            FROM bill
-            WHERE date(date) >= ? AND date(date) <= ?
+            FROM daily_sales
+            WHERE sale_date >= ? AND sale_date <= ?
         """
         result = self.db.execute_query(query, (start_date, end_date))
         
@@ -186,48 +204,26 @@ class SalesAnalytics:
         }
     
     def _count_units_sold(self, start_date: str, end_date: str) -> int:
-        """Count total units sold from bill details."""
+        """Count total units sold from bill line items."""
         query = """
-            SELECT bill_details, bill_variants_json 
-            FROM bill 
-            WHERE date(date) >= ? AND date(date) <= ?
+            SELECT COALESCE(SUM(bi.quantity), 0) as total_units
+            FROM bill b
+            JOIN bill_lines bi ON bi.bill_no = b.bill_no
+            WHERE b.date >= ? AND b.date <= ?
         """
-        bills = self.db.execute_query(query, (start_date, end_date))
-        
-        total_units = 0
-        for bill in bills:
-            # Try JSON format first
-            if bill.get('bill_variants_json'):
-                try:
-                    items = json.loads(bill['bill_variants_json'])
-                    total_units += sum(item.get('quantity', 0) for item in items)
-                    continue
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            
-            # Fall back to text format
-            if bill.get('bill_details'):
-                for line in bill['bill_details'].split('\n'):
-                    parts = [p.strip() for p in line.split('\t') if p.strip()]
-                    if len(parts) >= 2:
-                        try:
-                            total_units += int(parts[1])
-                        except ValueError:
-                            pass
-        
-        return total_units
+        result = self.db.execute_query(query, (start_date, end_date))
+        return result[0]['total_units'] if result else 0
     
     def get_daily_revenue_trend(self, start_date: str, end_date: str) -> pd.DataFrame:
         """Get daily revenue trend as DataFrame."""
         query = """
             SELECT 
-                date(date) as sale_date,
-                COUNT(*) as bill_count,
-                COALESCE(SUM(total), 0) as total_revenue,
-                COALESCE(AVG(total), 0) as avg_order_value
-            FROM bill
-            WHERE date(date) >= ? AND date(date) <= ?
-            GROUP BY date(date)
+                sale_date,
+                bill_count,
+                revenue as total_revenue,
+                revenue / bill_count as avg_order_value
+            FROM daily_sales
+            WHERE sale_date >= ? AND sale_date <= ? AND bill_count > 0
             ORDER BY sale_date
         """
         results = self.db.execute_query(query, (start_date, end_date))
@@ -239,106 +235,66 @@ class SalesAnalytics:
         df['sale_date'] = pd.to_datetime(df['sale_date'])
         return df
     
+    # Per-product quantity and revenue, aggregated in SQL from bill line items
+    PRODUCT_SALES_QUERY = """
+        SELECT 
+            bi.product_name,
+            SUM(bi.quantity) as quantity,
+            SUM(bi.quantity * bi.unit_price) as revenue
+        FROM bill b
+        JOIN bill_lines bi ON bi.bill_no = b.bill_no
+        WHERE b.date >= ? AND b.date <= ?
+        GROUP BY bi.product_name
+    """
+    
+    def _get_product_sales(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        Get quantity and revenue per product for a date range.
+        
+        Returns:
+            DataFrame with product_name, quantity and revenue columns
+        """
+        results = self.db.execute_query(self.PRODUCT_SALES_QUERY, (start_date, end_date))
+        
+        if not results:
+            return pd.DataFrame(columns=['product_name', 'quantity', 'revenue'])
+        
+        return pd.DataFrame(results)
+    
+    @staticmethod
+    def _rollup_sales(sales: pd.DataFrame, labels: List[str], label_column: str) -> pd.DataFrame:
+        """
+        Roll per-product sales up to a coarser label (product type, brand).
+        
+        Args:
+            sales: Frame from _get_product_sales
+            labels: Group label for each row of sales
+            label_column: Name of the label column in the result
+        
+        Returns:
+            DataFrame with label_column, quantity and revenue columns
+        """
+        codes, groups = group_codes(labels)
+        qty_array = sales['quantity'].to_numpy()
+        quantity = groupby_sum(codes, qty_array, len(groups))
+        if qty_array.dtype.kind == 'i':
+            quantity = quantity.astype(np.int64)
+        
+        return pd.DataFrame({
+            label_column: groups,
+            'quantity': quantity,
+            'revenue': groupby_sum(codes, sales['revenue'].to_numpy(dtype=np.float64), len(groups))
+        })
+    
     def get_top_products(self, start_date: str, end_date: str, limit: int = 10) -> List[Dict]:
         """Get top selling products by quantity."""
-        query = """
-            SELECT bill_details, bill_variants_json 
-            FROM bill 
-            WHERE date(date) >= ? AND date(date) <= ?
-        """
-        bills = self.db.execute_query(query, (start_date, end_date))
-        
-        product_sales = defaultdict(lambda: {'quantity': 0, 'revenue': 0})
-        
-        for bill in bills:
-            # Try JSON format
-            if bill.get('bill_variants_json'):
-                try:
-                    items = json.loads(bill['bill_variants_json'])
-                    for item in items:
-                        name = item.get('product_name', 'Unknown')
-                        qty = item.get('quantity', 0)
-                        price = item.get('unit_price', 0) * qty
-                        product_sales[name]['quantity'] += qty
-                        product_sales[name]['revenue'] += price
-                    continue
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            
-            # Fall back to text format
-            if bill.get('bill_details'):
-                for line in bill['bill_details'].split('\n'):
-                    parts = [p.strip() for p in line.split('\t') if p.strip()]
-                    if len(parts) >= 3:
-                        try:
-                            name = parts[0]
-                            qty = int(parts[1])
-                            price = float(parts[2]) * qty
-                            product_sales[name]['quantity'] += qty
-                            product_sales[name]['revenue'] += price
-                        except (ValueError, IndexError):
-                            pass
-        
-        # Sort by quantity and limit
-        sorted_products = sorted(
-            product_sales.items(),
-            key=lambda x: x[1]['quantity'],
-            reverse=True
-        )[:limit]
-        
-        return [
-            {'product_name': name, 'quantity': data['quantity'], 'revenue': data['revenue']}
-            for name, data in sorted_products
-        ]
+        query = self.PRODUCT_SALES_QUERY + " ORDER BY quantity DESC, bi.product_name LIMIT ?"
+        return self.db.execute_query(query, (start_date, end_date, limit))
     
     def get_bottom_products(self, start_date: str, end_date: str, limit: int = 10) -> List[Dict]:
         """Get lowest selling products."""
-        query = """
-            SELECT bill_details, bill_variants_json 
-            FROM bill 
-            WHERE date(date) >= ? AND date(date) <= ?
-        """
-        bills = self.db.execute_query(query, (start_date, end_date))
-        
-        product_sales = defaultdict(lambda: {'quantity': 0, 'revenue': 0})
-        
-        for bill in bills:
-            if bill.get('bill_variants_json'):
-                try:
-                    items = json.loads(bill['bill_variants_json'])
-                    for item in items:
-                        name = item.get('product_name', 'Unknown')
-                        qty = item.get('quantity', 0)
-                        price = item.get('unit_price', 0) * qty
-                        product_sales[name]['quantity'] += qty
-                        product_sales[name]['revenue'] += price
-                    continue
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            
-            if bill.get('bill_details'):
-                for line in bill['bill_details'].split('\n'):
-                    parts = [p.strip() for p in line.split('\t') if p.strip()]
-                    if len(parts) >= 3:
-                        try:
-                            name = parts[0]
-                            qty = int(parts[1])
-                            price = float(parts[2]) * qty
-                            product_sales[name]['quantity'] += qty
-                            product_sales[name]['revenue'] += price
-                        except (ValueError, IndexError):
-                            pass
-        
-        # Sort by quantity ascending
-        sorted_products = sorted(
-            product_sales.items(),
-            key=lambda x: x[1]['quantity']
-        )[:limit]
-        
-        return [
-            {'product_name': name, 'quantity': data['quantity'], 'revenue': data['revenue']}
-            for name, data in sorted_products
-        ]
+        query = self.PRODUCT_SALES_QUERY + " ORDER BY quantity ASC, bi.product_name LIMIT ?"
+        return self.db.execute_query(query, (start_date, end_date, limit))
     
     def get_sales_by_product_type(self, start_date: str, end_date: str) -> pd.DataFrame:
         """Get sales aggregated by product type."""
@@ -351,19 +307,12 @@ class SalesAnalytics:
         
         type_map = {row['product_name']: row['type_name'] for row in product_types}
         
-        # Get sales
-        top_products = self.get_top_products(start_date, end_date, limit=1000)
+        sales = self._get_product_sales(start_date, end_date)
+        if sales.empty:
+            return pd.DataFrame(columns=['product_type', 'quantity', 'revenue'])
         
-        type_sales = defaultdict(lambda: {'quantity': 0, 'revenue': 0})
-        for product in top_products:
-            ptype = type_map.get(product['product_name'], 'Other')
-            type_sales[ptype]['quantity'] += product['quantity']
-            type_sales[ptype]['revenue'] += product['revenue']
-        
-        return pd.DataFrame([
-            {'product_type': ptype, 'quantity': data['quantity'], 'revenue': data['revenue']}
-            for ptype, data in type_sales.items()
-        ])
+        types = [type_map.get(name, 'Other') for name in sales['product_name'].tolist()]
+        return self._rollup_sales(sales, types, 'product_type')
     
     def get_sales_by_brand(self, start_date: str, end_date: str) -> pd.DataFrame:
         """Get sales aggregated by brand."""
@@ -376,19 +325,12 @@ class SalesAnalytics:
         
         brand_map = {row['product_name']: row['brand_name'] for row in brands}
         
-        # Get sales
-        top_products = self.get_top_products(start_date, end_date, limit=1000)
+        sales = self._get_product_sales(start_date, end_date)
+        if sales.empty:
+            return pd.DataFrame(columns=['brand_name', 'quantity', 'revenue'])
         
-        brand_sales = defaultdict(lambda: {'quantity': 0, 'revenue': 0})
-        for product in top_products:
-            brand = brand_map.get(product['product_name'], 'Other')
-            brand_sales[brand]['quantity'] += product['quantity']
-            brand_sales[brand]['revenue'] += product['revenue']
-        
-        return pd.DataFrame([
-            {'brand_name': brand, 'quantity': data['quantity'], 'revenue': data['revenue']}
-            for brand, data in brand_sales.items()
-        ])
+        brands = [brand_map.get(name, 'Other') for name in sales['product_name'].tolist()]
+        return self._rollup_sales(sales, brands, 'brand_name')
 
 
 # =============================================================================
@@ -841,11 +783,11 @@ class AnalyticsEngine:
         
         return {
             'kpis': self.sales.get_sales_kpis(start, end),
-            'trend': self.sales.get_daily_revenue_trend(start, end).to_dict('records'),
+            'trend': _frame_records(self.sales.get_daily_revenue_trend(start, end)),
             'top_products': self.sales.get_top_products(start, end),
             'bottom_products': self.sales.get_bottom_products(start, end),
-            'by_type': self.sales.get_sales_by_product_type(start, end).to_dict('records'),
-            'by_brand': self.sales.get_sales_by_brand(start, end).to_dict('records'),
+            'by_type': _frame_records(self.sales.get_sales_by_product_type(start, end)),
+            'by_brand': _frame_records(self.sales.get_sales_by_brand(start, end)),
             'date_range': {'start': start, 'end': end}
         }
     
@@ -854,8 +796,8 @@ class AnalyticsEngine:
         return {
             'kpis': self.inventory.get_inventory_kpis(),
             'low_stock': self.inventory.get_low_stock_items(),
-            'by_type': self.inventory.get_stock_by_product_type().to_dict('records'),
-            'by_brand': self.inventory.get_stock_by_brand().to_dict('records')
+            'by_type': _frame_records(self.inventory.get_stock_by_product_type()),
+            'by_brand': _frame_records(self.inventory.get_stock_by_brand())
         }
     
     def get_profitability_analytics(self, date_range: str = "30D",
@@ -868,7 +810,7 @@ class AnalyticsEngine:
             'kpis': self.profitability.get_profitability_kpis(start, end),
             'by_product': self.profitability.get_profit_by_product(start, end),
             'loss_making': self.profitability.get_loss_making_products(start, end),
-            'by_category': self.profitability.get_profit_by_category(start, end).to_dict('records'),
+            'by_category': _frame_records(self.profitability.get_profit_by_category(start, end)),
             'date_range': {'start': start, 'end': end}
         }
     
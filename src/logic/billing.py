@@ -3,16 +3,63 @@ Billing business logic.
 Handles invoice generation, calculations, and bill management.
 """
 from datetime import datetime
-from typing import List, Optional, Tuple
+from itertools import product
+from typing import Dict, List, Optional, Tuple
 import config
 from src.database.connection import db
 from src.models.bill import Bill, BillItem
 from src.models.product import Product
+from src.logic._read_cache import cached_read
+
+
+def _filter_variants(select: str, filters: Tuple[str, ...], suffix: str = "") -> Dict[Tuple[bool, ...], str]:
+    """
+    Precompute one fixed SQL string per combination of optional filters.
+    Keeping the text stable lets SQLite reuse its compiled statements.
+    
+    Args:
+        select: SELECT ... FROM part of the query
+        filters: WHERE conditions, each applied only when its flag is set
+        suffix: Trailing clause (e.g. ORDER BY)
+    
+    Returns:
+        dict: Tuple of per-filter flags -> SQL string
+    """
+    queries = {}
+    for flags in product((False, True), repeat=len(filters)):
+        conditions = [f for f, enabled in zip(filters, flags) if enabled]
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        queries[flags] = f"{select}{where}{suffix}"
+    return queries
 
 
 class BillingService:
     """Service class for billing operations."""
     
+    # Keyed by (has_search_term, has_start_date, has_end_date)
+    _SEARCH_SQL = _filter_variants(
+        "SELECT * FROM bill",
+        ("(bill_no LIKE ? OR customer_name LIKE ?)", "date >= ?", "date <= ?"),
+        " ORDER BY date DESC, bill_no DESC"
+    )
+    
+    # Keyed by (has_start_date, has_end_date)
+    _BILL_COUNT_SQL = _filter_variants(
+        "SELECT COALESCE(SUM(bill_count), 0) as count FROM daily_sales",
+        ("sale_date >= ?", "sale_date <= ?")
+    )
+    
+    _DAILY_REVENUE_SQL = "SELECT revenue FROM daily_sales WHERE sale_date = ?"
+    _REVENUE_RANGE_SQL = """
+        SELECT sale_date, revenue FROM daily_sales
+        WHERE sale_date >= ? AND sale_date <= ?
+    """
+    
+    # Read cache shared by all instances: (method, args) -> (write_version, time, value)
+    CACHE_TTL = 60.0
+    CACHE_MAX_ENTRIES = 64
+    _read_cache: Dict[tuple, tuple] = {}
+    
     def __init__(self):
         self.db = db
     
@@ -122,23 +169,34 @@ class BillingService:
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
             
-            self.db.execute_insert(
-                insert_query,
-                (
-                    bill.bill_no, bill.date, bill.customer_name, bill.customer_no,
-                    bill_details, bill.subtotal, bill.discount, bill.tax_rate,
-                    bill.tax_amount, bill.total
-                )
-            )
+            update_query = """
+                UPDATE simple_products 
+                SET stock = stock - ? 
+                WHERE name = ?
+            """
             
-            # Update inventory stock in simple_products
-            for item in bill.items:
-                update_query = """
-                    UPDATE simple_products 
-                    SET stock = stock - ? 
-                    WHERE name = ?
-                """
-                self.db.execute_update(update_query, (item.quantity, item.product_name))
+            # Bill, line items and stock updates commit as one transaction
+            with self.db.get_cursor() as cursor:
+                cursor.execute(
+                    insert_query,
+                    (
+                        bill.bill_no, bill.date, bill.customer_name, bill.customer_no,
+                        bill_details, bill.subtotal, bill.discount, bill.tax_rate,
+                        bill.tax_amount, bill.total
+                    )
+                )
+                
+                # Normalized line items for analytics
+                cursor.executemany(
+                    "INSERT INTO bill_lines (bill_no, product_name, quantity, unit_price) VALUES (?, ?, ?, ?)",
+                    [(bill.bill_no, item.product_name, item.quantity, item.unit_price) for item in bill.items]
+                )
+                
+                # Update inventory stock in simple_products
+                cursor.executemany(
+                    update_query,
+                    [(item.quantity, item.product_name) for item in bill.items]
+                )
             
             return True
             
@@ -178,58 +236,60 @@ class BillingService:
         Returns:
             List of Bill objects
         """
-        query = "SELECT * FROM bill WHERE 1=1"
         params = []
         
         if search_term:
-            query += " AND (bill_no LIKE ? OR customer_name LIKE ?)"
             params.extend([f"%{search_term}%", f"%{search_term}%"])
         
         if start_date:
-            query += " AND date >= ?"
             params.append(start_date)
         
         if end_date:
-            query += " AND date <= ?"
             params.append(end_date)
         
-        query += " ORDER BY date DESC, bill_no DESC"
+        query = self._SEARCH_SQL[(bool(search_term), bool(start_date), bool(end_date))]
         
-        results = self.db.execute_query(query, tuple(params))
-        return [Bill.from_db_row(row) for row in results]
+        # Stream rows so large date ranges are built into Bills incrementally
+        return [Bill.from_db_row(row) for row in self.db.iter_query(query, tuple(params))]
     
     def get_bills_by_date(self, date: str) -> List[Bill]:
         """Get all bills for a specific date."""
         query = "SELECT * FROM bill WHERE date = ? ORDER BY bill_no"
-        results = self.db.execute_query(query, (date,))
-        return [Bill.from_db_row(row) for row in results]
+        return [Bill.from_db_row(row) for row in self.db.iter_query(query, (date,))]
     
     def get_todays_bills(self) -> List[Bill]:
         """Get all bills for today."""
         today = datetime.now().strftime("%Y-%m-%d")
         return self.get_bills_by_date(today)
     
+    @cached_read
     def calculate_daily_revenue(self, date: str) -> float:
         """Calculate total revenue for a specific date."""
-        query = "SELECT SUM(total) as revenue FROM bill WHERE date = ?"
-        results = self.db.execute_query(query, (date,))
+        results = self.db.execute_query(self._DAILY_REVENUE_SQL, (date,))
         
         if results and results[0]['revenue']:
             return float(results[0]['revenue'])
         return 0.0
     
-    def get_bill_count(self, start_date: str = None, end_date: str = None) -> int:
-        """Get count of bills within date range."""
-        query = "SELECT COUNT(*) as count FROM bill WHERE 1=1"
-        params = []
+    @cached_read
+    def get_daily_revenues(self, start_date: str, end_date: str) -> Dict[str, float]:
+        """
+        Get revenue per day for a date range in one query.
         
-        if start_date:
-            query += " AND date >= ?"
-            params.append(start_date)
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
         
-        if end_date:
-            query += " AND date <= ?"
-            params.append(end_date)
+        Returns:
+            Dict of date -> revenue; days without sales are left out
+        """
+        results = self.db.execute_query(self._REVENUE_RANGE_SQL, (start_date, end_date))
+        return {row['sale_date']: float(row['revenue'] or 0.0) for row in results}
+    
+    def get_bill_count(self, start_date: str = None, end_date: str = None) -> int:
+        """Get count of bills within date range."""
+        params = [d for d in (start_date, end_date) if d]
+        query = self._BILL_COUNT_SQL[(bool(start_date), bool(end_date))]
         
         results = self.db.execute_query(query, tuple(params))
         return results[0]['count'] if results else 0
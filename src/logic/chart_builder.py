@@ -3,13 +3,14 @@ Chart Builder for Enterprise Analytics Dashboard.
 Professional Matplotlib chart rendering with dark theme.
 Version: 2.0.0 | Created: January 2026
 """
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.artist import setp
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.ticker as mticker
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Optional, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 
 # =============================================================================
@@ -50,11 +51,18 @@ class ChartTheme:
     MIN_HEIGHT = 320
     MAX_HEIGHT = 420
     
-    # Safe margins to prevent clipping (INCREASED)
-    MARGIN_LEFT = 0.16
-    MARGIN_RIGHT = 0.94
-    MARGIN_TOP = 0.86
-    MARGIN_BOTTOM = 0.22
+    # Safe margins (left, right, top, bottom) per chart kind to prevent clipping.
+    # Fixed values measured from tight_layout output, so no layout solve per draw.
+    MARGINS = {
+        'trend': (0.21, 0.93, 0.72, 0.28),      # wide line chart, rotated dates
+        'barh': (0.29, 0.92, 0.80, 0.24),       # category labels on the left
+        'bar': (0.25, 0.96, 0.80, 0.30),        # rotated category labels below
+        'bar_short': (0.12, 0.97, 0.82, 0.38),  # short figure, rotated labels
+        'pie': (0.03, 0.97, 0.89, 0.04),
+        'gauge': (0.04, 0.96, 0.95, 0.05),
+        'sparkline': (0.0, 1.0, 1.0, 0.0),
+        'empty': (0.03, 0.97, 0.96, 0.04),
+    }
     
     @classmethod
     def setup_rcparams(cls):
@@ -106,25 +114,22 @@ class ChartTheme:
         return fig
     
     @classmethod
-    def finalize_figure(cls, fig, tight: bool = True):
-        """Apply safe margins to prevent text clipping."""
-        try:
-            # Apply subplots_adjust FIRST for consistent margins
-            fig.subplots_adjust(
-                left=cls.MARGIN_LEFT, 
-                right=cls.MARGIN_RIGHT, 
-                top=cls.MARGIN_TOP, 
-                bottom=cls.MARGIN_BOTTOM
-            )
-            # tight_layout can override, use large pad
-            if tight:
-                fig.tight_layout(pad=3.0, rect=[0.02, 0.02, 0.98, 0.96])
-        except Exception:
-            pass
+    def apply_margins(cls, fig, kind: str):
+        """Apply the fixed safe margins for a chart kind."""
+        left, right, top, bottom = cls.MARGINS[kind]
+        fig.subplots_adjust(left=left, right=right, top=top, bottom=bottom)
+    
+    @staticmethod
+    def truncate_labels(labels, max_chars: int) -> np.ndarray:
+        """Truncate labels longer than max_chars to max_chars + '..' in one vectorized pass."""
+        arr = np.asarray([str(label) for label in labels])
+        return np.where(np.char.str_len(arr) > max_chars,
+                        np.char.add(arr.astype(f'U{max_chars}'), '..'), arr)
     
     @classmethod
+    @lru_cache(maxsize=256)
     def wrap_text(cls, text: str, max_chars: int = 15) -> str:
-        """Wrap long text with line breaks."""
+        """Wrap long text with line breaks (memoized: labels repeat across refreshes)."""
         if len(text) <= max_chars:
             return text
         words = text.split()
@@ -142,6 +147,43 @@ class ChartTheme:
         return "\n".join(lines[:2])  # Max 2 lines
 
 
+# =============================================================================
+# DATA HELPERS
+# =============================================================================
+
+def _column(data: List[Dict], key: str) -> np.ndarray:
+    """Extract a numeric field from row dicts as a float64 array (missing -> 0)."""
+    return np.fromiter((row.get(key) or 0 for row in data), dtype=np.float64, count=len(data))
+
+
+def m4_downsample(x, y, width_px: int):
+    """
+    Downsample a series with M4: first, min, max and last point per pixel column.
+    The drawn line keeps the same visual envelope at a fraction of the points.
+    
+    Args:
+        x: X values (numbers or datetimes)
+        y: Y values aligned with x
+        width_px: Plot width in pixels (one bucket per pixel column)
+    
+    Returns:
+        Tuple of (x, y) arrays; unchanged when the series already fits
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if width_px <= 0 or n <= 4 * width_px:
+        return x, y
+    
+    keep = []
+    for bucket in np.array_split(np.arange(n), width_px):
+        segment = y[bucket]
+        keep.extend((bucket[0], bucket[np.argmin(segment)], bucket[np.argmax(segment)], bucket[-1]))
+    
+    idx = np.unique(keep)
+    return x[idx], y[idx]
+
+
 # =============================================================================
 # CHART BUILDER CLASS
 # =============================================================================
@@ -152,13 +194,104 @@ class ChartBuilder:
     All methods return FigureCanvas for embedding in PySide6.
     """
     
+    TREND_FIGSIZE = (8, 3.2)
+    # Above this many points the trend markers overlap into a solid band
+    TREND_MARKER_MAX_POINTS = 120
+    
     def __init__(self):
         self.theme = ChartTheme
+        # (fig, ax, canvas) per chart, reused across dashboard refreshes
+        self._cache: Dict[Tuple[str, tuple], Tuple[Figure, Any, FigureCanvas]] = {}
+        # Blitting state per cached chart: animated artists and saved background
+        self._blit_state: Dict[Tuple[str, tuple], Dict[str, Any]] = {}
+        # Artists updated in place by build_margin_gauge
+        self._gauge_artists: Dict[Tuple[str, tuple], Dict[str, Any]] = {}
+    
+    def _get_chart(self, chart_id: Optional[str], figsize: tuple, **subplot_kw) -> Tuple[Figure, Any, FigureCanvas]:
+        """
+        Get the figure, axes and canvas for a chart.
+        
+        The first call for a chart id creates them; later calls return the same
+        objects with the axes cleared, so a refresh only redraws artists.
+        
+        Args:
+            chart_id: Cache key for the chart, or None for an uncached one-off chart
+            figsize: Figure size in inches
+            **subplot_kw: Extra arguments for add_subplot (e.g. projection)
+        
+        Returns:
+            Tuple of (fig, ax, canvas)
+        """
+        key = (chart_id, figsize)
+        cached = self._cache.get(key) if chart_id is not None else None
+        if cached is not None:
+            cached[1].cla()
+            return cached
+        
+        fig = self.theme.create_figure(figsize=figsize)
+        ax = fig.add_subplot(111, **subplot_kw)
+        chart = (fig, ax, FigureCanvas(fig))
+        if chart_id is not None:
+            self._cache[key] = chart
+        return chart
+    
+    def _set_blit_artists(self, key: Tuple[str, tuple], artists: list, **extra):
+        """
+        Register the data artists of a cached chart for blitting.
+        
+        The artists are marked animated so full draws leave them out of the
+        saved background; every full draw (first show, resize) re-captures the
+        background and paints the artists on top.
+        
+        Args:
+            key: Chart cache key
+            artists: Artists redrawn on blit updates
+            **extra: Data the update path needs to decide whether a blit is valid
+        """
+        fig, ax, canvas = self._cache[key]
+        for artist in artists:
+            artist.set_animated(True)
+        
+        state = self._blit_state.get(key)
+        if state is None:
+            state = {}
+            
+            def on_draw(event):
+                state['background'] = canvas.copy_from_bbox(fig.bbox)
+                for artist in state['artists']:
+                    ax.draw_artist(artist)
+            
+            canvas.mpl_connect('draw_event', on_draw)
+            self._blit_state[key] = state
+        
+        state.update(extra, artists=artists, background=None)
+    
+    def _blit(self, key: Tuple[str, tuple]):
+        """Restore the saved background and redraw only the animated artists."""
+        fig, ax, canvas = self._cache[key]
+        state = self._blit_state[key]
+        if state['background'] is None:
+            canvas.draw_idle()
+            return
+        
+        canvas.restore_region(state['background'])
+        for artist in state['artists']:
+            ax.draw_artist(artist)
+        canvas.blit(fig.bbox)
     
     # =========================================================================
     # SALES CHARTS
     # =========================================================================
     
+    def _trend_series(self, fig: Figure, data: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the (downsampled) dates and revenue values plotted by the trend chart."""
+        dates = np.array([row['sale_date'] for row in data], dtype='datetime64[ns]')
+        values = _column(data, 'total_revenue')
+        
+        # Long ranges: no more than 4 points per pixel column
+        width_px = int(fig.get_figwidth() * fig.dpi)
+        return m4_downsample(dates, values, width_px)
+    
     def build_revenue_trend(self, data: List[Dict], title: str = "Revenue Trend") -> FigureCanvas:
         """
         Build revenue trend line chart.
@@ -166,9 +299,11 @@ class ChartBuilder:
         Args:
             data: List of dicts with 'sale_date' and 'total_revenue'
         """
-        fig = self.theme.create_figure(figsize=(8, 3.2))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('revenue_trend', self.TREND_FIGSIZE)
         self.theme.apply_to_axes(ax, title=title, ylabel='Revenue (₹)')
+        blit_artists = []
+        dates = None
+        annotated = False
         
         if not data:
             ax.text(0.5, 0.5, 'No data available', ha='center', va='center',
@@ -176,41 +311,69 @@ class ChartBuilder:
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            df = pd.DataFrame(data)
-            if 'sale_date' in df.columns:
-                dates = pd.to_datetime(df['sale_date'])
-                values = df['total_revenue'].values
+            if 'sale_date' in data[0]:
+                dates, values = self._trend_series(fig, data)
                 
-                # Plot line with gradient fill
-                ax.plot(dates, values, marker='o', linewidth=2.5, markersize=7,
-                        color=self.theme.SUCCESS, markerfacecolor=self.theme.SUCCESS,
-                        markeredgecolor='white', markeredgewidth=1.5)
-                ax.fill_between(dates, values, alpha=0.15, color=self.theme.SUCCESS)
+                # Plot line with gradient fill; long ranges skip the per-point markers
+                marker = 'o' if len(values) <= self.TREND_MARKER_MAX_POINTS else None
+                line, = ax.plot(dates, values, marker=marker, linewidth=2.5, markersize=7,
+                                color=self.theme.SUCCESS, markerfacecolor=self.theme.SUCCESS,
+                                markeredgecolor='white', markeredgewidth=1.5)
+                fill = ax.fill_between(dates, values, alpha=0.15, color=self.theme.SUCCESS)
+                blit_artists = [line, fill]
                 
                 # Format x-axis
-                ax.xaxis.set_major_formatter(plt.matplotlib.dates.DateFormatter('%d %b'))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=35, ha='right', fontsize=9)
+                ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+                setp(ax.xaxis.get_majorticklabels(), rotation=35, ha='right', fontsize=9)
                 
                 # Format y-axis with currency
                 ax.yaxis.set_major_formatter(mticker.FuncFormatter(lambda x, p: f'₹{x:,.0f}'))
                 
                 # Value labels on points (only if few points)
-                if len(values) <= 10:
+                annotated = len(values) <= 10
+                if annotated:
                     for i, (d, v) in enumerate(zip(dates, values)):
                         if v > 0:
                             ax.annotate(f'₹{v:,.0f}', (d, v), textcoords='offset points',
                                         xytext=(0, 10), ha='center', fontsize=9,
                                         color=self.theme.TEXT_PRIMARY, fontweight='bold')
         
-        self.theme.finalize_figure(fig)
-        canvas = FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'trend')
+        self._set_blit_artists(('revenue_trend', self.TREND_FIGSIZE), blit_artists,
+                               dates=dates, title=title, annotated=annotated)
         canvas.setMinimumHeight(340)
+        canvas.draw_idle()
         return canvas
     
+    def update_revenue_trend(self, data: List[Dict], title: str = "Revenue Trend") -> FigureCanvas:
+        """
+        Update the revenue trend, blitting only the line when possible.
+        
+        Blitting is used when the dates are unchanged and the new values fit the
+        current y-axis (e.g. today's revenue moved); anything else that would
+        change ticks, limits or labels falls back to build_revenue_trend.
+        """
+        key = ('revenue_trend', self.TREND_FIGSIZE)
+        state = self._blit_state.get(key)
+        if (state and state['dates'] is not None and not state['annotated']
+                and state['title'] == title and data and 'sale_date' in data[0]):
+            fig, ax, canvas = self._cache[key]
+            dates, values = self._trend_series(fig, data)
+            ymin, ymax = ax.get_ylim()
+            if np.array_equal(dates, state['dates']) and ymin <= values.min() and values.max() <= ymax:
+                line, fill = state['artists']
+                line.set_data(dates, values)
+                fill.remove()
+                fill = ax.fill_between(dates, values, alpha=0.15, color=self.theme.SUCCESS, animated=True)
+                state['artists'] = [line, fill]
+                self._blit(key)
+                return canvas
+        
+        return self.build_revenue_trend(data, title)
+    
     def build_sales_by_type(self, data: List[Dict], title: str = "Sales by Product Type") -> FigureCanvas:
         """Build horizontal bar chart for sales by product type."""
-        fig = self.theme.create_figure(figsize=(6, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('sales_by_type', (6, 4))
         self.theme.apply_to_axes(ax, title=title, xlabel='Revenue (₹)')
         
         if not data:
@@ -219,15 +382,11 @@ class ChartBuilder:
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            df = pd.DataFrame(data).sort_values('revenue', ascending=True)
-            
-            categories = df['product_type'].values
-            revenues = df['revenue'].values
-            
-            # Limit to top 5 for better visibility
-            if len(categories) > 5:
-                categories = categories[-5:]
-                revenues = revenues[-5:]
+            # Ascending by revenue, limited to top 5 for better visibility
+            revenues = _column(data, 'revenue')
+            order = np.argsort(revenues, kind='stable')[-5:]
+            categories = [data[i]['product_type'] for i in order]
+            revenues = revenues[order]
             
             # Truncate long category names
             categories = [self.theme.wrap_text(str(c), 12) for c in categories]
@@ -237,26 +396,22 @@ class ChartBuilder:
             
             # Value labels with offset
             max_rev = max(revenues) if len(revenues) > 0 else 1
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + max_rev * 0.04, bar.get_y() + bar.get_height()/2,
-                        f'₹{width:,.0f}', va='center', fontsize=10,
-                        color=self.theme.TEXT_PRIMARY, fontweight='bold')
+            ax.bar_label(bars, labels=[f'₹{v:,.0f}' for v in revenues], padding=8,
+                         fontsize=10, color=self.theme.TEXT_PRIMARY, fontweight='bold')
             
             ax.xaxis.set_major_formatter(mticker.FuncFormatter(
                 lambda x, p: f'₹{x/1000:.0f}K' if x >= 1000 else f'₹{x:.0f}'))
             ax.set_xlim(0, max_rev * 1.30)  # Extra space for labels
             ax.margins(y=0.1)
         
-        self.theme.finalize_figure(fig)
-        canvas = FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'barh')
         canvas.setMinimumHeight(340)
+        canvas.draw_idle()
         return canvas
     
     def build_sales_by_brand(self, data: List[Dict], title: str = "Sales by Brand") -> FigureCanvas:
         """Build bar chart for sales by brand."""
-        fig = self.theme.create_figure(figsize=(6, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('sales_by_brand', (6, 4))
         self.theme.apply_to_axes(ax, title=title, ylabel='Revenue (₹)')
         
         if not data:
@@ -265,13 +420,13 @@ class ChartBuilder:
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            df = pd.DataFrame(data).sort_values('revenue', ascending=False)
-            
-            brands = df['brand_name'].values[:5]  # Limit to 5 for readability
-            revenues = df['revenue'].values[:5]
+            revenues = _column(data, 'revenue')
+            order = np.argsort(-revenues, kind='stable')[:5]  # Limit to 5 for readability
+            brands = [data[i]['brand_name'] for i in order]
+            revenues = revenues[order]
             
             # Truncate long brand names
-            brands = [b[:10] + '..' if len(str(b)) > 10 else b for b in brands]
+            brands = self.theme.truncate_labels(brands, 10)
             
             x = np.arange(len(brands))
             bars = ax.bar(x, revenues, color=self.theme.PALETTE_BARS[:len(brands)], 
@@ -282,24 +437,20 @@ class ChartBuilder:
             
             # Value labels with offset
             max_rev = max(revenues) if len(revenues) > 0 else 1
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2, height + max_rev * 0.03,
-                        f'₹{height:,.0f}', ha='center', va='bottom',
-                        fontsize=10, color=self.theme.TEXT_PRIMARY, fontweight='bold')
+            ax.bar_label(bars, labels=[f'₹{v:,.0f}' for v in revenues], padding=4,
+                         fontsize=10, color=self.theme.TEXT_PRIMARY, fontweight='bold')
             
             ax.set_ylim(0, max_rev * 1.20)  # Extra space for labels
             ax.margins(x=0.1)
         
-        self.theme.finalize_figure(fig)
-        canvas = FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'bar')
         canvas.setMinimumHeight(340)
+        canvas.draw_idle()
         return canvas
     
     def build_top_products_chart(self, data: List[Dict], title: str = "Top Products") -> FigureCanvas:
         """Build horizontal bar chart for top products."""
-        fig = self.theme.create_figure(figsize=(6, 4.2))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('top_products_chart', (6, 4.2))
         self.theme.apply_to_axes(ax, title=title, xlabel='Quantity Sold')
         
         if not data:
@@ -318,18 +469,15 @@ class ChartBuilder:
             
             # Value labels with offset
             max_qty = max(quantities) if quantities else 1
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + max_qty * 0.04, bar.get_y() + bar.get_height()/2,
-                        f'{int(width)}', va='center', fontsize=11,
-                        color=self.theme.TEXT_PRIMARY, fontweight='bold')
+            ax.bar_label(bars, labels=[f'{int(q)}' for q in quantities[::-1]], padding=8,
+                         fontsize=11, color=self.theme.TEXT_PRIMARY, fontweight='bold')
             
             ax.set_xlim(0, max_qty * 1.25)
             ax.margins(y=0.1)
         
-        self.theme.finalize_figure(fig)
-        canvas = FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'barh')
         canvas.setMinimumHeight(340)
+        canvas.draw_idle()
         return canvas
     
     # =========================================================================
@@ -338,19 +486,20 @@ class ChartBuilder:
     
     def build_stock_distribution_pie(self, data: List[Dict], title: str = "Stock Distribution") -> FigureCanvas:
         """Build donut chart for stock distribution by type."""
-        fig = self.theme.create_figure(figsize=(5, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('stock_distribution_pie', (5, 4))
         
         if not data or all(d.get('stock_value', 0) == 0 for d in data):
             ax.text(0.5, 0.5, 'No inventory data', ha='center', va='center',
                     transform=ax.transAxes, color=self.theme.TEXT_SECONDARY, fontsize=14)
             ax.axis('off')
         else:
-            df = pd.DataFrame(data)
-            df = df[df['stock_value'] > 0].sort_values('stock_value', ascending=False)
+            values = _column(data, 'stock_value')
+            order = np.argsort(-values, kind='stable')
+            order = order[values[order] > 0][:6]
             
-            labels = df['product_type'].values[:6] if 'product_type' in df.columns else df['brand_name'].values[:6]
-            values = df['stock_value'].values[:6]
+            label_key = 'product_type' if 'product_type' in data[0] else 'brand_name'
+            labels = [data[i][label_key] for i in order]
+            values = values[order]
             
             colors = self.theme.PALETTE_BARS[:len(labels)]
             
@@ -362,20 +511,20 @@ class ChartBuilder:
             )
             
             # Center text
-            total = sum(values)
+            total = values.sum()
             ax.text(0, 0, f'₹{total:,.0f}\nTotal', ha='center', va='center',
                     fontsize=11, fontweight='bold', color=self.theme.TEXT_PRIMARY)
             
             ax.set_title(title, fontsize=14, fontweight='600', 
                         color=self.theme.TEXT_PRIMARY, pad=10)
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'pie')
+        canvas.draw_idle()
+        return canvas
     
     def build_stock_status_bars(self, kpis: Dict, title: str = "Stock Status") -> FigureCanvas:
         """Build horizontal bar chart for stock status counts."""
-        fig = self.theme.create_figure(figsize=(5, 3))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('stock_status_bars', (5, 3))
         self.theme.apply_to_axes(ax, title=title)
         
         categories = ['OK', 'Low Stock', 'Out of Stock', 'Expired']
@@ -390,15 +539,12 @@ class ChartBuilder:
         
         bars = ax.barh(categories, counts, color=colors, height=0.6)
         
-        for bar in bars:
-            width = bar.get_width()
-            if width > 0:
-                ax.text(width + max(counts) * 0.02, bar.get_y() + bar.get_height()/2,
-                        f'{int(width)}', va='center', fontsize=10,
-                        color=self.theme.TEXT_PRIMARY, fontweight='bold')
+        ax.bar_label(bars, labels=[f'{int(c)}' if c > 0 else '' for c in counts], padding=4,
+                     fontsize=10, color=self.theme.TEXT_PRIMARY, fontweight='bold')
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'barh')
+        canvas.draw_idle()
+        return canvas
     
     # =========================================================================
     # PROFITABILITY CHARTS
@@ -406,8 +552,7 @@ class ChartBuilder:
     
     def build_profit_by_product(self, data: List[Dict], title: str = "Profit by Product") -> FigureCanvas:
         """Build horizontal bar chart for profit by product."""
-        fig = self.theme.create_figure(figsize=(6, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('profit_by_product', (6, 4))
         self.theme.apply_to_axes(ax, title=title, xlabel='Profit (₹)')
         
         if not data:
@@ -417,32 +562,26 @@ class ChartBuilder:
             ax.set_yticks([])
         else:
             # Truncate names
-            names = [p['product_name'][:18] + '..' if len(p['product_name']) > 18 else p['product_name'] for p in data[:8]]
-            profits = [p['profit'] for p in data[:8]]
+            names = self.theme.truncate_labels([p['product_name'] for p in data[:8]], 18)
+            profits = _column(data[:8], 'profit')
             
-            colors = [self.theme.SUCCESS if p > 0 else self.theme.DANGER for p in profits]
+            colors = np.where(profits > 0, self.theme.SUCCESS, self.theme.DANGER)
             bars = ax.barh(names[::-1], profits[::-1], color=colors[::-1], height=0.6)
             
             # Zero line
             ax.axvline(x=0, color=self.theme.BORDER_COLOR, linewidth=1)
             
-            # Value labels
-            max_val = max(abs(p) for p in profits) if profits else 1
-            for bar in bars:
-                width = bar.get_width()
-                xpos = width + max_val * 0.02 if width >= 0 else width - max_val * 0.02
-                ha = 'left' if width >= 0 else 'right'
-                ax.text(xpos, bar.get_y() + bar.get_height()/2,
-                        f'₹{width:,.0f}', va='center', ha=ha,
-                        fontsize=8, color=self.theme.TEXT_PRIMARY, fontweight='bold')
+            # Value labels (bar_label places negative bars' labels on the left)
+            ax.bar_label(bars, labels=[f'₹{p:,.0f}' for p in profits[::-1]], padding=4,
+                         fontsize=8, color=self.theme.TEXT_PRIMARY, fontweight='bold')
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'barh')
+        canvas.draw_idle()
+        return canvas
     
     def build_profit_by_category(self, data: List[Dict], title: str = "Profit by Category") -> FigureCanvas:
         """Build bar chart for profit by category."""
-        fig = self.theme.create_figure(figsize=(6, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('profit_by_category', (6, 4))
         self.theme.apply_to_axes(ax, title=title, ylabel='Profit (₹)')
         
         if not data:
@@ -451,14 +590,15 @@ class ChartBuilder:
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            df = pd.DataFrame(data).sort_values('profit', ascending=False)
+            profits = _column(data, 'profit')
+            order = np.argsort(-profits, kind='stable')[:8]
             
-            categories = df['product_type'].values[:8]
-            profits = df['profit'].values[:8]
-            margins = df['margin_percent'].values[:8]
+            categories = [data[i]['product_type'] for i in order]
+            profits = profits[order]
+            margins = _column(data, 'margin_percent')[order]
             
             x = np.arange(len(categories))
-            colors = [self.theme.SUCCESS if p > 0 else self.theme.DANGER for p in profits]
+            colors = np.where(profits > 0, self.theme.SUCCESS, self.theme.DANGER)
             bars = ax.bar(x, profits, color=colors, width=0.6, edgecolor='none')
             
             ax.set_xticks(x)
@@ -466,21 +606,45 @@ class ChartBuilder:
             ax.axhline(y=0, color=self.theme.BORDER_COLOR, linewidth=1)
             
             # Margin labels on top
-            for i, (bar, margin) in enumerate(zip(bars, margins)):
-                height = bar.get_height()
-                ypos = height + max(abs(p) for p in profits) * 0.02 if height >= 0 else height - max(abs(p) for p in profits) * 0.02
-                va = 'bottom' if height >= 0 else 'top'
-                ax.text(bar.get_x() + bar.get_width()/2, ypos,
-                        f'{margin:.1f}%', ha='center', va=va,
-                        fontsize=8, color=self.theme.TEXT_SECONDARY)
+            ax.bar_label(bars, labels=[f'{m:.1f}%' for m in margins], padding=3,
+                         fontsize=8, color=self.theme.TEXT_SECONDARY)
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'bar')
+        canvas.draw_idle()
+        return canvas
+    
+    # Gauge arc angles; a value arc is this scaled by the margin fraction
+    GAUGE_THETA = np.linspace(0, np.pi, 100)
+    
+    def _gauge_arc_verts(self, fraction: float) -> np.ndarray:
+        """Get the polygon vertices (theta, r) of a gauge arc covering the given fraction."""
+        theta = self.GAUGE_THETA * fraction
+        return np.concatenate([
+            np.column_stack([theta, np.ones_like(theta)]),
+            np.column_stack([theta[::-1], np.zeros_like(theta)]),
+        ])
     
     def build_margin_gauge(self, margin_percent: float, title: str = "Gross Margin") -> FigureCanvas:
-        """Build a simple gauge-style chart for margin percentage."""
-        fig = self.theme.create_figure(figsize=(4, 3))
-        ax = fig.add_subplot(111, projection='polar')
+        """
+        Build a simple gauge-style chart for margin percentage.
+        
+        The polar setup and background arc are built once; later calls only
+        update the value arc and the labels.
+        """
+        key = ('margin_gauge', (4, 3))
+        color = self.theme.SUCCESS if margin_percent >= 20 else self.theme.WARNING if margin_percent >= 10 else self.theme.DANGER
+        
+        gauge = self._gauge_artists.get(key)
+        if gauge is not None:
+            fig, ax, canvas = self._cache[key]
+            gauge['value_arc'].set_verts([self._gauge_arc_verts(margin_percent / 100)])
+            gauge['value_arc'].set_facecolor(color)
+            gauge['value_text'].set_text(f'{margin_percent:.1f}%')
+            gauge['title_text'].set_text(title)
+            canvas.draw_idle()
+            return canvas
+        
+        fig, ax, canvas = self._get_chart('margin_gauge', (4, 3), projection='polar')
         
         # Configure gauge
         ax.set_theta_zero_location('N')
@@ -489,13 +653,11 @@ class ChartBuilder:
         ax.set_thetamax(180)
         
         # Background arc
-        theta = np.linspace(0, np.pi, 100)
-        ax.fill_between(theta, 0, 1, color=self.theme.GRID_COLOR, alpha=0.3)
+        ax.fill_between(self.GAUGE_THETA, 0, 1, color=self.theme.GRID_COLOR, alpha=0.3)
         
         # Value arc
-        value_theta = np.linspace(0, np.pi * (margin_percent / 100), 100)
-        color = self.theme.SUCCESS if margin_percent >= 20 else self.theme.WARNING if margin_percent >= 10 else self.theme.DANGER
-        ax.fill_between(value_theta, 0, 1, color=color, alpha=0.8)
+        value_arc = ax.fill_between(self.GAUGE_THETA, 0, 1, color=color, alpha=0.8)
+        value_arc.set_verts([self._gauge_arc_verts(margin_percent / 100)])
         
         # Hide polar elements
         ax.set_rticks([])
@@ -503,15 +665,19 @@ class ChartBuilder:
         ax.spines['polar'].set_visible(False)
         
         # Center text
-        ax.text(np.pi/2, -0.3, f'{margin_percent:.1f}%', ha='center', va='center',
-                fontsize=24, fontweight='bold', color=self.theme.TEXT_PRIMARY,
-                transform=ax.transData)
-        ax.text(np.pi/2, -0.6, title, ha='center', va='center',
-                fontsize=11, color=self.theme.TEXT_SECONDARY)
+        value_text = ax.text(np.pi/2, -0.3, f'{margin_percent:.1f}%', ha='center', va='center',
+                             fontsize=24, fontweight='bold', color=self.theme.TEXT_PRIMARY,
+                             transform=ax.transData)
+        title_text = ax.text(np.pi/2, -0.6, title, ha='center', va='center',
+                             fontsize=11, color=self.theme.TEXT_SECONDARY)
         
         fig.patch.set_facecolor(self.theme.BG_CARD)
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'gauge')
+        self._gauge_artists[key] = {
+            'value_arc': value_arc, 'value_text': value_text, 'title_text': title_text
+        }
+        canvas.draw_idle()
+        return canvas
     
     # =========================================================================
     # SUPPLIER CHARTS
@@ -519,8 +685,7 @@ class ChartBuilder:
     
     def build_supplier_performance(self, data: List[Dict], title: str = "Supplier Performance") -> FigureCanvas:
         """Build bar chart for supplier performance."""
-        fig = self.theme.create_figure(figsize=(6, 4))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('supplier_performance', (6, 4))
         self.theme.apply_to_axes(ax, title=title, xlabel='Products Supplied')
         
         if not data:
@@ -535,19 +700,16 @@ class ChartBuilder:
             colors = self.theme.PALETTE_BARS[:len(names)]
             bars = ax.barh(names[::-1], counts[::-1], color=colors[::-1], height=0.6)
             
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(width + max(counts) * 0.02, bar.get_y() + bar.get_height()/2,
-                        f'{int(width)}', va='center', fontsize=9,
-                        color=self.theme.TEXT_PRIMARY, fontweight='bold')
+            ax.bar_label(bars, labels=[f'{int(c)}' for c in counts[::-1]], padding=4,
+                         fontsize=9, color=self.theme.TEXT_PRIMARY, fontweight='bold')
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'barh')
+        canvas.draw_idle()
+        return canvas
     
     def build_lead_time_chart(self, data: List[Dict], title: str = "Avg Lead Time (Days)") -> FigureCanvas:
         """Build bar chart for supplier lead times."""
-        fig = self.theme.create_figure(figsize=(6, 3))
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart('lead_time_chart', (6, 3))
         self.theme.apply_to_axes(ax, title=title, ylabel='Days')
         
         if not data or all(d.get('avg_lead_time', 0) == 0 for d in data):
@@ -556,27 +718,27 @@ class ChartBuilder:
             ax.set_xticks([])
             ax.set_yticks([])
         else:
-            df = pd.DataFrame(data)
-            df = df[df['avg_lead_time'] > 0].sort_values('avg_lead_time')
+            lead_times = _column(data, 'avg_lead_time')
+            order = np.argsort(lead_times, kind='stable')
+            order = order[lead_times[order] > 0][:8]
             
-            names = df['supplier_name'].values[:8]
-            lead_times = df['avg_lead_time'].values[:8]
+            names = [data[i]['supplier_name'] for i in order]
+            lead_times = lead_times[order]
             
             x = np.arange(len(names))
-            colors = [self.theme.SUCCESS if lt <= 7 else self.theme.WARNING if lt <= 14 else self.theme.DANGER for lt in lead_times]
+            colors = np.select([lead_times <= 7, lead_times <= 14],
+                               [self.theme.SUCCESS, self.theme.WARNING], self.theme.DANGER)
             bars = ax.bar(x, lead_times, color=colors, width=0.6)
             
             ax.set_xticks(x)
             ax.set_xticklabels(names, rotation=45, ha='right', fontsize=8)
             
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2, height,
-                        f'{height:.0f}d', ha='center', va='bottom',
-                        fontsize=8, color=self.theme.TEXT_PRIMARY)
+            ax.bar_label(bars, labels=[f'{lt:.0f}d' for lt in lead_times],
+                         fontsize=8, color=self.theme.TEXT_PRIMARY)
         
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'bar_short')
+        canvas.draw_idle()
+        return canvas
     
     # =========================================================================
     # UTILITY METHODS
@@ -584,31 +746,35 @@ class ChartBuilder:
     
     def build_empty_chart(self, message: str = "No data available", figsize: tuple = (6, 4)) -> FigureCanvas:
         """Build an empty chart with a message."""
-        fig = self.theme.create_figure(figsize=figsize)
-        ax = fig.add_subplot(111)
+        fig, ax, canvas = self._get_chart(None, figsize)
         ax.set_facecolor(self.theme.BG_CARD)
         ax.text(0.5, 0.5, message, ha='center', va='center',
                 transform=ax.transAxes, color=self.theme.TEXT_SECONDARY, fontsize=14)
         ax.axis('off')
-        fig.tight_layout()
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'empty')
+        return canvas
     
-    def build_kpi_sparkline(self, values: List[float], color: str = None, figsize: tuple = (2, 0.5)) -> FigureCanvas:
-        """Build a mini sparkline chart for KPI cards."""
-        fig = self.theme.create_figure(figsize=figsize)
-        ax = fig.add_subplot(111)
-        ax.set_facecolor(self.theme.BG_CARD)
-        
+    def build_kpi_sparkline(self, values: List[float], color: str = None, figsize: tuple = (2, 0.5),
+                            chart_id: str = None) -> FigureCanvas:
+        """
+        Build a mini sparkline chart for KPI cards.
+        Pass a chart_id to reuse the same canvas when the card is refreshed.
+        """
         if not values or len(values) < 2:
             return self.build_empty_chart("", figsize)
         
+        fig, ax, canvas = self._get_chart(f'sparkline:{chart_id}' if chart_id else None, figsize)
+        ax.set_facecolor(self.theme.BG_CARD)
+        
         color = color or self.theme.PRIMARY
-        ax.plot(values, linewidth=1.5, color=color)
-        ax.fill_between(range(len(values)), values, alpha=0.1, color=color)
+        x, y = m4_downsample(np.arange(len(values)), values, int(fig.get_figwidth() * fig.dpi))
+        ax.plot(x, y, linewidth=1.5, color=color)
+        ax.fill_between(x, y, alpha=0.1, color=color)
         
         # Remove all axes
         ax.axis('off')
         ax.margins(x=0, y=0.1)
         
-        fig.tight_layout(pad=0)
-        return FigureCanvas(fig)
+        self.theme.apply_margins(fig, 'sparkline')
+        canvas.draw_idle()
+        return canvas
@@ -3,7 +3,6 @@ Employee management business logic.
 """
 from typing import List, Optional
 import random
-import string
 import config
 from src.database.connection import db
 from src.models.employee import Employee
@@ -12,15 +11,46 @@ from src.models.employee import Employee
 class EmployeeService:
     """Service class for employee operations."""
     
+    # Explicit column list so rows unpack positionally in Employee.from_rows_bulk
+    _SELECT_EMPLOYEES = f"SELECT {', '.join(Employee.DB_COLUMNS)} FROM employee"
+    
+    _ALL_SQL = f"{_SELECT_EMPLOYEES} ORDER BY name"
+    _BY_ID_SQL = f"{_SELECT_EMPLOYEES} WHERE emp_id = ?"
+    _SEARCH_SQL = f"{_SELECT_EMPLOYEES} WHERE emp_id LIKE ? OR name LIKE ? ORDER BY name"
+    _BY_ROLE_SQL = f"{_SELECT_EMPLOYEES} WHERE role = ? ORDER BY name"
+    _IDS_SQL = "SELECT emp_id FROM employee"
+    _INSERT_SQL = """
+        INSERT INTO employee (
+            emp_id, name, password, role, contact_num,
+            address, designation, aadhar_number
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    _UPDATE_SQL = """
+        UPDATE employee 
+        SET name = ?, password = ?, role = ?,
+            contact_num = ?, address = ?, 
+            designation = ?, aadhar_number = ?
+        WHERE emp_id = ?
+    """
+    _DELETE_SQL = "DELETE FROM employee WHERE emp_id = ?"
+    _PASSWORD_SQL = "UPDATE employee SET password = ? WHERE emp_id = ?"
+    _KPI_SQL = """
+        SELECT COUNT(*) as total, COALESCE(SUM(role = 'Admin'), 0) as admins
+        FROM employee
+    """
+    
     def __init__(self):
         self.db = db
     
     def generate_employee_id(self) -> str:
         """Generate a unique employee ID."""
+        # Load taken IDs once and check candidates in memory
+        results = self.db.execute_query(self._IDS_SQL)
+        existing = {row['emp_id'] for row in results}
+        
         while True:
-            digits = ''.join(random.choice(string.digits) for _ in range(6))
-            emp_id = f"EMP{digits}"
-            if not self.get_employee_by_id(emp_id):
+            emp_id = f"EMP{random.randrange(1_000_000):06d}"
+            if emp_id not in existing:
                 return emp_id
     
     def authenticate(self, emp_id: str, password: str) -> Optional[Employee]:
@@ -28,19 +58,21 @@ class EmployeeService:
         employee = self.get_employee_by_id(emp_id)
         
         if employee and employee.verify_password(password):
+            # Upgrade legacy plain-text and unsalted hashes now that the password is known
+            if employee.needs_rehash():
+                hashed_password = Employee.hash_password(password)
+                if self._set_password_hash(emp_id, hashed_password):
+                    employee.password = hashed_password
             return employee
         return None
     
     def get_all_employees(self) -> List[Employee]:
         """Get all employees."""
-        query = "SELECT * FROM employee ORDER BY name"
-        results = self.db.execute_query(query)
-        return [Employee.from_db_row(row) for row in results]
+        return Employee.from_rows_bulk(self.db.iter_query(self._ALL_SQL))
     
     def get_employee_by_id(self, emp_id: str) -> Optional[Employee]:
         """Get employee by ID."""
-        query = "SELECT * FROM employee WHERE emp_id = ?"
-        results = self.db.execute_query(query, (emp_id,))
+        results = self.db.execute_query(self._BY_ID_SQL, (emp_id,))
         
         if results:
             return Employee.from_db_row(results[0])
@@ -48,33 +80,18 @@ class EmployeeService:
     
     def search_employees(self, search_term: str) -> List[Employee]:
         """Search employees by name or employee ID."""
-        query = """
-            SELECT * FROM employee 
-            WHERE emp_id LIKE ? OR name LIKE ?
-            ORDER BY name
-        """
         search_pattern = f"%{search_term}%"
-        results = self.db.execute_query(query, (search_pattern, search_pattern))
-        return [Employee.from_db_row(row) for row in results]
+        return Employee.from_rows_bulk(self.db.iter_query(self._SEARCH_SQL, (search_pattern, search_pattern)))
     
     def get_employees_by_role(self, role: str) -> List[Employee]:
         """Get employees filtered by role."""
-        query = "SELECT * FROM employee WHERE role = ? ORDER BY name"
-        results = self.db.execute_query(query, (role,))
-        return [Employee.from_db_row(row) for row in results]
+        return Employee.from_rows_bulk(self.db.iter_query(self._BY_ROLE_SQL, (role,)))
     
     def add_employee(self, employee: Employee) -> bool:
         """Add a new employee."""
         try:
-            query = """
-                INSERT INTO employee (
-                    emp_id, name, password, role, contact_num,
-                    address, designation, aadhar_number
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
             self.db.execute_insert(
-                query,
+                self._INSERT_SQL,
                 (
                     employee.emp_id, employee.get_full_name(),
                     employee.password, employee.role, employee.contact_number,
@@ -90,16 +107,8 @@ class EmployeeService:
     def update_employee(self, employee: Employee) -> bool:
         """Update an existing employee."""
         try:
-            query = """
-                UPDATE employee 
-                SET name = ?, password = ?, role = ?,
-                    contact_num = ?, address = ?, 
-                    designation = ?, aadhar_number = ?
-                WHERE emp_id = ?
-            """
-            
             self.db.execute_update(
-                query,
+                self._UPDATE_SQL,
                 (
                     employee.get_full_name(), employee.password,
                     employee.role, employee.contact_number,
@@ -115,32 +124,45 @@ class EmployeeService:
     def delete_employee(self, emp_id: str) -> bool:
         """Delete an employee."""
         try:
-            query = "DELETE FROM employee WHERE emp_id = ?"
-            self.db.execute_update(query, (emp_id,))
+            self.db.execute_update(self._DELETE_SQL, (emp_id,))
             return True
         except Exception as e:
             print(f"Error deleting employee: {str(e)}")
             return False
     
     def change_password(self, emp_id: str, new_password: str) -> bool:
-        """Change employee password."""
+        """
+        Change employee password.
+        Hashing is PBKDF2 and takes tens of milliseconds, so UI code should
+        call this through src.ui.workers.start_task.
+        """
+        return self._set_password_hash(emp_id, Employee.hash_password(new_password))
+    
+    def _set_password_hash(self, emp_id: str, hashed_password: str) -> bool:
+        """Store an already-hashed password."""
         try:
-            hashed_password = Employee.hash_password(new_password)
-            query = "UPDATE employee SET password = ? WHERE emp_id = ?"
-            self.db.execute_update(query, (hashed_password, emp_id))
+            self.db.execute_update(self._PASSWORD_SQL, (hashed_password, emp_id))
             return True
         except Exception as e:
             print(f"Error changing password: {str(e)}")
             return False
     
+    def get_employee_kpis(self) -> dict:
+        """
+        Get employee counts for the dashboard in a single query.
+        
+        Returns:
+            dict: {'total': all employees, 'admins': employees with the Admin role}
+        """
+        results = self.db.execute_query(self._KPI_SQL)
+        if results:
+            return {'total': results[0]['total'], 'admins': results[0]['admins']}
+        return {'total': 0, 'admins': 0}
+    
     def get_total_employee_count(self) -> int:
         """Get total number of employees."""
-        query = "SELECT COUNT(*) as count FROM employee"
-        results = self.db.execute_query(query)
-        return results[0]['count'] if results else 0
+        return self.get_employee_kpis()['total']
     
     def get_admin_count(self) -> int:
         """Get number of admin users."""
-        query = "SELECT COUNT(*) as count FROM employee WHERE role = 'Admin'"
-        results = self.db.execute_query(query)
-        return results[0]['count'] if results else 0
+        return self.get_employee_kpis()['admins']
@@ -1,387 +1,299 @@
 """
 Inventory management business logic.
 """
-from typing import List, Optional
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from src.database.connection import DatabaseConnection
 from src.models.product import Product
-import config
+from src.logic._read_cache import cached_read
 
 
 class InventoryService:
     """Service for managing inventory operations with professional schema."""
     
+    # Catalogue reads go through the trigger-maintained products_denorm table
+    _SELECT_PRODUCTS = """
+        SELECT product_id, product_name, product_cat, COALESCE(stock, 0) AS stock,
+               COALESCE(mrp, 0.0) AS mrp, base_unit, brand_name
+        FROM products_denorm
+    """
+    
+    _ALL_SQL = f"{_SELECT_PRODUCTS} ORDER BY product_name"
+    _BY_ID_SQL = f"{_SELECT_PRODUCTS} WHERE product_id = ?"
+    _BY_NAME_SQL = f"{_SELECT_PRODUCTS} WHERE product_name = ?"
+    _BY_CATEGORY_SQL = f"{_SELECT_PRODUCTS} WHERE product_cat = ? ORDER BY product_name"
+    _LOW_STOCK_SQL = f"{_SELECT_PRODUCTS} WHERE stock <= ? ORDER BY products_denorm.stock ASC"
+    _UPDATE_STOCK_SQL = """
+        UPDATE inventory
+        SET stock_quantity = stock_quantity + ?,
+            last_updated = datetime('now')
+        WHERE variant_id IN (
+            SELECT variant_id FROM product_variants
+            WHERE product_id = ? AND is_default = 1
+        )
+        RETURNING stock_quantity
+    """
+    _SEARCH_LIKE_SQL = f"""
+        {_SELECT_PRODUCTS}
+        WHERE search_blob LIKE ?
+        ORDER BY product_name
+    """
+    _SEARCH_FTS_SQL = """
+        SELECT d.product_id, d.product_name, d.product_cat, COALESCE(d.stock, 0) AS stock,
+               COALESCE(d.mrp, 0.0) AS mrp, d.base_unit, d.brand_name
+        FROM products_fts f
+        JOIN products_denorm d ON d.product_id = f.rowid
+        WHERE products_fts MATCH ?
+        ORDER BY d.product_name
+    """
+    
+    # Reserve the next product code number for a type in one statement
+    _NEXT_SEQUENCE_SQL = """
+        INSERT INTO code_sequences (product_type_id, last_sequence) VALUES (?, 1)
+        ON CONFLICT(product_type_id) DO UPDATE SET last_sequence = last_sequence + 1
+        RETURNING last_sequence
+    """
+    
+    # Read cache shared by all instances: (method, args) -> (write_version, time, value)
+    CACHE_TTL = 5.0
+    CACHE_MAX_ENTRIES = 256
+    _read_cache: Dict[tuple, tuple] = {}
+    
     def __init__(self):
         self.db = DatabaseConnection()
-        self.db_path = config.DATABASE_PATH  # Fixed: was config.DB_PATH
     
-    def get_all_products(self):
-        """Get all products with their default variants."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_code,
-                p.product_name,
-                p.description,
-                p.base_unit,
-                p.hsn_code,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.variant_id,
-                pv.variant_name,
-                pv.sku,
-                pv.unit_size,
-                pv.mrp,
-                pv.cost_price,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE p.is_active = 1
-            ORDER BY p.product_name
+    def _query_products(self, query: str, params: tuple = ()) -> List[Product]:
         """
-        results = self.db.execute_query(query)
-        
-        products = []
-        for row in results:
-            product = Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-            products.append(product)
+        Run a catalogue query and build Products from its rows.
         
-        return products
+        Rows are unpacked positionally in _SELECT_PRODUCTS column order, which
+        follows the leading Product fields; missing stock/mrp are defaulted in SQL.
+        """
+        return [
+            Product(product_id, product_name, product_cat, stock, mrp, unit, supplier_name=brand_name)
+            for product_id, product_name, product_cat, stock, mrp, unit, brand_name
+            in self.db.iter_query(query, params)
+        ]
+    
+    def get_all_products(self):
+        """Get all products with their default variants."""
+        return self._query_products(self._ALL_SQL)
     
+    @cached_read
     def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """Get product by ID."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_name,
-                p.base_unit,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.mrp,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE p.product_id = ? AND p.is_active = 1
-        """
-        results = self.db.execute_query(query, (product_id,))
-        
-        if results:
-            row = results[0]
-            return Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-        return None
+        results = self._query_products(self._BY_ID_SQL, (product_id,))
+        return results[0] if results else None
     
+    @cached_read
     def get_product_by_name(self, product_name: str) -> Optional[Product]:
         """Get product by name (for billing compatibility)."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_name,
-                p.base_unit,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.mrp,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE p.product_name = ? AND p.is_active = 1
-        """
-        results = self.db.execute_query(query, (product_name,))
-        
-        if results:
-            row = results[0]
-            return Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-        return None
+        results = self._query_products(self._BY_NAME_SQL, (product_name,))
+        return results[0] if results else None
     
     def search_products(self, search_term: str) -> List[Product]:
-        """Search products by name or code."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_name,
-                p.base_unit,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.mrp,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE (p.product_name LIKE ? OR p.product_code LIKE ? OR pv.sku LIKE ?)
-            AND p.is_active = 1
-            ORDER BY p.product_name
-        """
-        search_pattern = f"%{search_term}%"
-        results = self.db.execute_query(query, (search_pattern, search_pattern, search_pattern))
-        
-        products = []
-        for row in results:
-            product = Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-            products.append(product)
-        
-        return products
+        """Search products by name, code or SKU."""
+        # Trigrams need at least 3 characters; shorter terms scan with LIKE
+        if len(search_term) >= 3 and self._has_fts():
+            query = self._SEARCH_FTS_SQL
+            # Quote the term so FTS5 treats it as a literal substring
+            params = ('"' + search_term.replace('"', '""') + '"',)
+        else:
+            query = self._SEARCH_LIKE_SQL
+            params = (f"%{search_term}%",)
+        return self._query_products(query, params)
     
+    @cached_read
+    def _has_fts(self) -> bool:
+        """Check whether the products_fts full-text index exists."""
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+        return bool(self.db.execute_query(query))
+    
+    @cached_read
     def get_categories(self) -> List[str]:
         """Get unique product categories."""
         query = "SELECT DISTINCT type_name FROM product_types WHERE is_active = 1 ORDER BY display_order, type_name"
         results = self.db.execute_query(query)
         return [row['type_name'] for row in results]
     
+    @cached_read
     def get_products_by_category(self, category: str, subcategory: Optional[str] = None) -> List[Product]:
         """Get products by category."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_name,
-                p.base_unit,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.mrp,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE pt.type_name = ? AND p.is_active = 1
-            ORDER BY p.product_name
+        return self._query_products(self._BY_CATEGORY_SQL, (category,))
+    
+    @cached_read
+    def get_dashboard_stats(self) -> dict:
         """
-        results = self.db.execute_query(query, (category,))
-        
-        products = []
-        for row in results:
-            product = Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-            products.append(product)
+        Get active product count and stock value for the dashboard in a single query.
         
-        return products
+        Returns:
+            dict: {'count': active products, 'stock_value': stock quantity x cost price}
+        """
+        query = """
+            SELECT
+                (SELECT COUNT(*) FROM products WHERE is_active = 1) as count,
+                (SELECT COALESCE(SUM(i.stock_quantity * pv.cost_price), 0.0)
+                 FROM inventory i
+                 JOIN product_variants pv ON i.variant_id = pv.variant_id
+                 JOIN products p ON pv.product_id = p.product_id
+                 WHERE p.is_active = 1) as total_value
+        """
+        result = self.db.execute_query(query)
+        if result:
+            return {'count': result[0]['count'], 'stock_value': result[0]['total_value']}
+        return {'count': 0, 'stock_value': 0.0}
     
     def get_total_product_count(self) -> int:
         """Get total number of active products."""
-        query = "SELECT COUNT(*) as count FROM products WHERE is_active = 1"
-        result = self.db.execute_query(query)
-        return result[0]['count'] if result else 0
+        return self.get_dashboard_stats()['count']
     
     def get_total_stock_value(self) -> float:
         """Calculate total stock value."""
-        query = """
-            SELECT SUM(i.stock_quantity * pv.cost_price) as total_value
-            FROM inventory i
-            JOIN product_variants pv ON i.variant_id = pv.variant_id
-            JOIN products p ON pv.product_id = p.product_id
-            WHERE p.is_active = 1
-        """
-        result = self.db.execute_query(query)
-        return result[0]['total_value'] if result and result[0]['total_value'] else 0.0
+        return self.get_dashboard_stats()['stock_value']
     
     def get_low_stock_products(self, threshold: int = 10) -> List[Product]:
         """Get products with low stock."""
-        query = """
-            SELECT 
-                p.product_id,
-                p.product_name,
-                p.base_unit,
-                b.brand_name,
-                pt.type_name as product_cat,
-                pv.mrp,
-                i.stock_quantity as stock
-            FROM products p
-            JOIN brands b ON p.brand_id = b.brand_id
-            JOIN product_types pt ON p.product_type_id = pt.product_type_id
-            LEFT JOIN product_variants pv ON p.product_id = pv.product_id AND pv.is_default = 1
-            LEFT JOIN inventory i ON pv.variant_id = i.variant_id
-            WHERE i.stock_quantity <= ? AND p.is_active = 1
-            ORDER BY i.stock_quantity ASC
+        return self._query_products(self._LOW_STOCK_SQL, (threshold,))
+    
+    def get_dashboard_bundle(self, low_stock_threshold: int = 10) -> dict:
         """
-        results = self.db.execute_query(query, (threshold,))
+        Get the inventory figures dashboards show together.
         
-        products = []
-        for row in results:
-            product = Product(
-                product_id=row['product_id'],
-                product_name=row['product_name'],
-                product_cat=row['product_cat'],
-                stock=row['stock'] if row['stock'] is not None else 0,
-                unit=row['base_unit'],
-                mrp=row['mrp'] if row['mrp'] is not None else 0.0,
-                supplier_name=row['brand_name']
-            )
-            products.append(product)
+        The queries are independent and each runs on its own pooled read
+        connection; sqlite3 releases the GIL while a query executes, so the
+        wait is the slowest query rather than the sum of all of them.
         
-        return products
+        Returns:
+            dict: {'count', 'stock_value', 'categories', 'low_stock'}
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            stats = executor.submit(self.get_dashboard_stats)
+            categories = executor.submit(self.get_categories)
+            low_stock = executor.submit(self.get_low_stock_products, low_stock_threshold)
+            return {
+                'count': stats.result()['count'],
+                'stock_value': stats.result()['stock_value'],
+                'categories': categories.result(),
+                'low_stock': low_stock.result(),
+            }
     
-    def update_stock(self, product_id: int, quantity: int) -> bool:
-        """Update product stock (for default variant)."""
+    def update_stock(self, product_id: int, quantity: int) -> Optional[float]:
+        """
+        Update product stock (for default variant).
+        
+        Called inside an open db.get_cursor() block (e.g. a billing loop), the
+        update joins that transaction instead of committing on its own.
+        
+        Returns:
+            New stock of the default variant, or None if the product has no
+            default variant stock row or the update failed
+        """
         try:
-            query = """
-                UPDATE inventory
-                SET stock_quantity = stock_quantity + ?,
-                    last_updated = datetime('now')
-                WHERE variant_id IN (
-                    SELECT variant_id FROM product_variants
-                    WHERE product_id = ? AND is_default = 1
-                )
-            """
-            self.db.execute_update(query, (quantity, product_id))
-            return True
+            with self.db.get_cursor() as cursor:
+                cursor.execute(self._UPDATE_STOCK_SQL, (quantity, product_id))
+                row = cursor.fetchone()
+            return float(row[0]) if row else None
         except Exception as e:
             print(f"Error updating stock: {str(e)}")
-            return False
+            return None
     
     def add_product_with_variants(self, product_data: dict) -> bool:
         """
         Add a new product with its variants and initial inventory.
         Returns True if successful, False otherwise.
         """
-        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Generate product code if not provided
-            product_code = product_data.get('product_code')
-            if not product_code:
-                # Get type abbreviation
+            # Product, variants and inventory commit as one transaction on the writer
+            with self.db.get_cursor() as cursor:
+                # Advance the type's code counter; it numbers the code if none was given
                 type_id = product_data['product_type_id']
-                cursor.execute("SELECT type_name FROM product_types WHERE product_type_id = ?", (type_id,))
-                type_result = cursor.fetchone()
-                type_abbr = type_result[0][:3].upper() if type_result else "PRD"
+                cursor.execute(self._NEXT_SEQUENCE_SQL, (type_id,))
+                sequence = cursor.fetchone()[0]
+                product_code = product_data.get('product_code')
+                if not product_code:
+                    product_code = f"JL-{self._type_abbr(type_id)}-{sequence:03d}"
                 
-                # Get next product number
-                cursor.execute("SELECT COUNT(*) FROM products WHERE product_type_id = ?", (type_id,))
-                count = cursor.fetchone()[0]
-                product_code = f"JL-{type_abbr}-{count + 1:03d}"
-            
-            # Insert product
-            cursor.execute("""
-                INSERT INTO products (
-                    product_code, product_name, brand_id, product_type_id,
-                    base_unit, hsn_code, description, is_active, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-            """, (
-                product_code,
-                product_data['product_name'],
-                product_data['brand_id'],
-                product_data['product_type_id'],
-                product_data.get('base_unit', 'Kg'),
-                product_data.get('hsn_code', ''),
-                product_data.get('description', ''),
-                product_data.get('is_active', 1)
-            ))
-            
-            product_id = cursor.lastrowid
-            
-            # Insert variants and inventory
-            for variant in product_data['variants']:
-                # Insert variant
+                # Insert product
                 cursor.execute("""
+                    INSERT INTO products (
+                        product_code, product_name, brand_id, product_type_id,
+                        base_unit, hsn_code, description, is_active, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                """, (
+                    product_code,
+                    product_data['product_name'],
+                    product_data['brand_id'],
+                    product_data['product_type_id'],
+                    product_data.get('base_unit', 'Kg'),
+                    product_data.get('hsn_code', ''),
+                    product_data.get('description', ''),
+                    product_data.get('is_active', 1)
+                ))
+                
+                product_id = cursor.lastrowid
+                
+                # Insert variants and inventory
+                variants = product_data['variants']
+                cursor.executemany("""
                     INSERT INTO product_variants (
                         product_id, variant_name, sku, unit_size, size_unit,
                         mrp, cost_price, is_default, is_active, created_at
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, datetime('now'))
-                """, (
-                    product_id,
-                    variant['variant_name'],
-                    variant['sku'],
-                    variant['unit_size'],
-                    variant['size_unit'],
-                    variant['mrp'],
-                    variant['cost_price'],
-                    1 if variant['is_default'] else 0
-                ))
-                
-                variant_id = cursor.lastrowid
+                """, [
+                    (
+                        product_id,
+                        variant['variant_name'],
+                        variant['sku'],
+                        variant['unit_size'],
+                        variant['size_unit'],
+                        variant['mrp'],
+                        variant['cost_price'],
+                        1 if variant['is_default'] else 0
+                    )
+                    for variant in variants
+                ])
                 
-                # Insert initial inventory
-                cursor.execute("""
+                # Insert initial inventory, resolving each variant_id by its unique SKU
+                cursor.executemany("""
                     INSERT INTO inventory (
                         variant_id, stock_quantity, reorder_level,
                         last_updated
-                    ) VALUES (?, ?, ?, datetime('now'))
-                """, (
-                    variant_id,
-                    variant.get('initial_stock', 0),
-                    variant.get('reorder_level', 10)
-                ))
+                    )
+                    SELECT variant_id, ?, ?, datetime('now')
+                    FROM product_variants WHERE sku = ?
+                """, [
+                    (
+                        variant.get('initial_stock', 0),
+                        variant.get('reorder_level', 10),
+                        variant['sku']
+                    )
+                    for variant in variants
+                ])
             
-            conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
             print(f"Error adding product: {str(e)}")
-            if conn:
-                conn.rollback()
-                conn.close()
             return False
     
     def get_next_product_code(self, product_type_id: int) -> str:
-        """Generate next product code for a given type."""
+        """Preview the next product code for a given type without reserving it."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get type abbreviation
-            cursor.execute("SELECT type_name FROM product_types WHERE product_type_id = ?", (product_type_id,))
-            type_result = cursor.fetchone()
-            type_abbr = type_result[0][:3].upper() if type_result else "PRD"
-            
-            # Get next number
-            cursor.execute("SELECT COUNT(*) FROM products WHERE product_type_id = ?", (product_type_id,))
-            count = cursor.fetchone()[0]
-            
-            conn.close()
-            return f"JL-{type_abbr}-{count + 1:03d}"
+            result = self.db.execute_query(
+                "SELECT last_sequence FROM code_sequences WHERE product_type_id = ?",
+                (product_type_id,)
+            )
+            last_sequence = result[0]['last_sequence'] if result else 0
+            return f"JL-{self._type_abbr(product_type_id)}-{last_sequence + 1:03d}"
             
         except Exception as e:
             print(f"Error generating product code: {str(e)}")
             return "JL-NEW-001"
+    
+    @cached_read
+    def _type_abbr(self, product_type_id: int) -> str:
+        """Get the three-letter product code prefix for a product type."""
+        result = self.db.execute_query(
+            "SELECT type_name FROM product_types WHERE product_type_id = ?", (product_type_id,)
+        )
+        return result[0]['type_name'][:3].upper() if result else "PRD"
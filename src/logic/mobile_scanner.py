@@ -3,37 +3,73 @@ Mobile Scanner Integration Module.
 Allows using a smartphone as a wireless barcode scanner via HTTP.
 Works with apps like "Barcode to PC", "QR Scanner to PC", or any HTTP-capable scanner app.
 """
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 import threading
 import socket
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _encode_response(status: int, message: str) -> bytes:
+    """Encode a scanner JSON response body."""
+    return json.dumps(
+        {'status': 'ok' if status == 200 else 'error', 'message': message},
+        separators=(',', ':')
+    ).encode()
+
+
 class MobileScannerHandler(BaseHTTPRequestHandler):
     """HTTP handler for receiving barcode scans from mobile apps."""
     
     callback: Optional[Callable] = None
     last_scan: str = ""
     
+    # Repeats of a barcode within this many seconds are dropped (apps retry on flaky WiFi)
+    DEDUP_WINDOW = 0.5
+    _recent_scans: Dict[str, float] = {}
+    _recent_lock = threading.Lock()
+    
+    # Largest POST body accepted; barcodes are well under 100 bytes
+    MAX_BODY_SIZE = 8192
+    
+    # Bodies of the fixed responses, encoded once
+    _STATIC_RESPONSES = {
+        (status, message): _encode_response(status, message)
+        for status, message in (
+            (200, 'OK'),
+            (200, 'Mobile Scanner Server Running'),
+            (400, 'Missing barcode parameter'),
+            (400, 'Missing barcode in payload'),
+            (400, 'Invalid request'),
+            (400, 'Empty request'),
+            (404, 'Not found'),
+            (413, 'Request body too large'),
+        )
+    }
+    
     def log_message(self, format, *args):
         """Suppress default logging."""
         pass
     
     def _send_response(self, status: int, message: str):
         """Send HTTP response."""
+        body = self._STATIC_RESPONSES.get((status, message))
+        if body is None:
+            body = _encode_response(status, message)
+        
         self.send_response(status)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
-        response = json.dumps({'status': 'ok' if status == 200 else 'error', 'message': message})
-        self.wfile.write(response.encode())
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """Handle CORS preflight."""
@@ -64,13 +100,26 @@ class MobileScannerHandler(BaseHTTPRequestHandler):
     
     def do_POST(self):
         """Handle POST requests - for JSON payloads."""
-        content_length = int(self.headers.get('Content-Length', 0))
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
         
-        if content_length > 0:
-            body = self.rfile.read(content_length).decode('utf-8')
+        if content_length > self.MAX_BODY_SIZE:
+            # Never read an oversized body; drop the connection after refusing it
+            self.close_connection = True
+            self._send_response(413, 'Request body too large')
+        elif content_length < 0:
+            self._send_response(400, 'Invalid request')
+        elif content_length > 0:
+            body = self.rfile.read(content_length)
             
             try:
+                # json.loads takes the raw bytes; only plain-text bodies need decoding
                 data = json.loads(body)
+                if not isinstance(data, dict):
+                    # A bare numeric barcode is valid JSON; treat it as plain text
+                    raise json.JSONDecodeError('Not a JSON object', '', 0)
                 barcode = data.get('code') or data.get('barcode') or data.get('text')
                 
                 if barcode:
@@ -80,7 +129,7 @@ class MobileScannerHandler(BaseHTTPRequestHandler):
                     self._send_response(400, 'Missing barcode in payload')
             except json.JSONDecodeError:
                 # Treat as plain text barcode
-                barcode = body.strip()
+                barcode = body.decode('utf-8', errors='replace').strip()
                 if barcode:
                     self._process_scan(barcode)
                     self._send_response(200, f'Scanned: {barcode}')
@@ -91,6 +140,10 @@ class MobileScannerHandler(BaseHTTPRequestHandler):
     
     def _process_scan(self, barcode: str):
         """Process received barcode."""
+        if self._is_duplicate(barcode):
+            logger.info(f"Duplicate mobile scan dropped: {barcode}")
+            return
+        
         MobileScannerHandler.last_scan = barcode
         logger.info(f"Mobile scan received: {barcode}")
         
@@ -99,6 +152,23 @@ class MobileScannerHandler(BaseHTTPRequestHandler):
                 MobileScannerHandler.callback(barcode)
             except Exception as e:
                 logger.error(f"Scan callback error: {e}")
+    
+    @classmethod
+    def _is_duplicate(cls, barcode: str) -> bool:
+        """Check whether the barcode was already scanned within DEDUP_WINDOW, and record it."""
+        now = time.monotonic()
+        with cls._recent_lock:
+            last = cls._recent_scans.get(barcode)
+            if last is not None and now - last < cls.DEDUP_WINDOW:
+                return True
+            cls._recent_scans[barcode] = now
+            
+            # Keep the table small by forgetting scans well outside the window
+            if len(cls._recent_scans) > 64:
+                cutoff = now - 4 * cls.DEDUP_WINDOW
+                for code in [c for c, t in cls._recent_scans.items() if t < cutoff]:
+                    del cls._recent_scans[code]
+        return False
 
 
 class MobileScannerServer:
@@ -123,13 +193,27 @@ class MobileScannerServer:
     
     def __init__(self, port: int = None):
         self.port = port or self.DEFAULT_PORT
-        self.server: Optional[HTTPServer] = None
+        self.server: Optional[ThreadingHTTPServer] = None
         self.thread: Optional[threading.Thread] = None
         self.running = False
         self._scan_callback: Optional[Callable] = None
+        self._cached_ip: Optional[str] = None
     
     def get_local_ip(self) -> str:
-        """Get local IP address for mobile connection."""
+        """
+        Get local IP address for mobile connection.
+        The address is looked up once and reused until invalidate_ip_cache() is called.
+        """
+        if self._cached_ip is None:
+            self._cached_ip = self._lookup_local_ip()
+        return self._cached_ip
+    
+    def invalidate_ip_cache(self):
+        """Forget the cached local IP, e.g. after the network connection changes."""
+        self._cached_ip = None
+    
+    def _lookup_local_ip(self) -> str:
+        """Find the local IP address by routing a UDP socket (no packets are sent)."""
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
@@ -156,11 +240,14 @@ class MobileScannerServer:
             return self.get_connection_info()
         
         try:
-            self.server = HTTPServer(('0.0.0.0', self.port), MobileScannerHandler)
+            # One thread per request so a slow client or callback never blocks other scans
+            self.server = ThreadingHTTPServer(('0.0.0.0', self.port), MobileScannerHandler)
             self.thread = threading.Thread(target=self._run_server, daemon=True)
             self.thread.start()
             self.running = True
             
+            # Refresh the address on each start in case the network changed while stopped
+            self.invalidate_ip_cache()
             logger.info(f"Mobile scanner server started on port {self.port}")
             return self.get_connection_info()
             
@@ -3,13 +3,33 @@ Payment Integration Module for 2026 Indian Standards.
 Supports UPI, Cash, Card, Digital Wallets, and Split Payments.
 NPCI compliant with GST invoice support.
 """
-from typing import List, Optional, Dict
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
 from src.database.connection import DatabaseConnection
 from datetime import datetime
 import json
+from urllib.parse import quote
+import numpy as np
 import config
 
 
+def _build_upi_prefix(upi_id: str = None) -> str:
+    """Build the payee part of a UPI payment string from config."""
+    upi_id = upi_id or getattr(config, 'MERCHANT_UPI_ID', 'merchant@upi')
+    merchant_name = quote(getattr(config, 'COMPANY_NAME', 'Store'))
+    return f"upi://pay?pa={upi_id}&pn={merchant_name}&"
+
+
+# Payee part of every UPI payment string; only amount and bill number vary per QR code
+_UPI_PREFIX = _build_upi_prefix()
+
+
+def refresh_config():
+    """Rebuild the cached UPI payee prefix after config values change."""
+    global _UPI_PREFIX
+    _UPI_PREFIX = _build_upi_prefix()
+
+
 class PaymentMethod:
     """Enum-like class for payment methods."""
     CASH = 'CASH'
@@ -18,20 +38,23 @@ class PaymentMethod:
     WALLET = 'WALLET'
     CREDIT = 'CREDIT'
     
+    ALL_METHODS = (CASH, UPI, CARD, WALLET, CREDIT)
+    
+    DISPLAY_NAMES = {
+        CASH: 'Cash',
+        UPI: 'UPI / QR Code',
+        CARD: 'Credit/Debit Card',
+        WALLET: 'Digital Wallet',
+        CREDIT: 'Credit / Pay Later'
+    }
+    
     @classmethod
-    def all_methods(cls) -> List[str]:
-        return [cls.CASH, cls.UPI, cls.CARD, cls.WALLET, cls.CREDIT]
+    def all_methods(cls) -> Tuple[str, ...]:
+        return cls.ALL_METHODS
     
     @classmethod
     def get_display_name(cls, method: str) -> str:
-        names = {
-            cls.CASH: 'Cash',
-            cls.UPI: 'UPI / QR Code',
-            cls.CARD: 'Credit/Debit Card',
-            cls.WALLET: 'Digital Wallet',
-            cls.CREDIT: 'Credit / Pay Later'
-        }
-        return names.get(method, method)
+        return cls.DISPLAY_NAMES.get(method, method)
 
 
 class PaymentStatus:
@@ -45,6 +68,9 @@ class PaymentStatus:
 class PaymentTransaction:
     """Represents a single payment transaction."""
     
+    # One is created per payment; slots drop the per-instance __dict__
+    __slots__ = ('payment_method', 'amount', 'reference', 'status', 'metadata', 'timestamp', '_timestamp_iso')
+    
     def __init__(self, 
                  payment_method: str,
                  amount: float,
@@ -57,6 +83,14 @@ class PaymentTransaction:
         self.status = status
         self.metadata = metadata or {}
         self.timestamp = datetime.now()
+        self._timestamp_iso: Optional[str] = None
+    
+    @property
+    def timestamp_iso(self) -> str:
+        """ISO-formatted timestamp, formatted once for both saving and to_dict."""
+        if self._timestamp_iso is None:
+            self._timestamp_iso = self.timestamp.isoformat()
+        return self._timestamp_iso
     
     def to_dict(self) -> dict:
         return {
@@ -65,7 +99,7 @@ class PaymentTransaction:
             'reference': self.reference,
             'status': self.status,
             'metadata': self.metadata,
-            'timestamp': self.timestamp.isoformat()
+            'timestamp': self.timestamp_iso
         }
 
 
@@ -77,11 +111,29 @@ class PaymentHandler:
     
     # Common cash denominations in India
     CASH_DENOMINATIONS = [10, 20, 50, 100, 200, 500, 2000]
+    _DENOMINATIONS_ARRAY = np.array(CASH_DENOMINATIONS, dtype=np.float64)
     
     # UPI daily limit (NPCI 2026)
     UPI_DAILY_LIMIT = 100000  # ₹1,00,000
     UPI_MEDICAL_LIMIT = 500000  # ₹5,00,000 for medical/education
     
+    # validate_upi_amount results, built once
+    _UPI_VALID = (True, "Valid")
+    _UPI_NOT_POSITIVE = (False, "Amount must be greater than zero")
+    _UPI_OVER_DAILY = (False, f"Amount exceeds UPI limit of ₹{UPI_DAILY_LIMIT:,.2f}")
+    _UPI_OVER_MEDICAL = (False, f"Amount exceeds UPI limit of ₹{UPI_MEDICAL_LIMIT:,.2f}")
+    
+    _INSERT_PAYMENT_SQL = """
+        INSERT INTO payment_transactions 
+        (bill_id, payment_method, amount, payment_reference, payment_status, metadata, payment_timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    _BILL_PAYMENTS_SQL = """
+        SELECT * FROM payment_transactions 
+        WHERE bill_id = ? 
+        ORDER BY payment_timestamp
+    """
+    
     def __init__(self):
         self.db = DatabaseConnection()
     
@@ -95,29 +147,48 @@ class PaymentHandler:
         Get suggested cash amounts based on bill total.
         Returns common denominations that are >= bill total.
         """
-        suggestions = []
-        
-        # Add rounded amounts
-        rounded_up = int((bill_total // 10 + 1) * 10)
-        rounded_100 = int((bill_total // 100 + 1) * 100)
-        
-        for denom in self.CASH_DENOMINATIONS:
-            if denom >= bill_total:
-                suggestions.append(denom)
+        # CASH_DENOMINATIONS is sorted, so the notes covering the bill are a suffix
+        suggestions = set(self.CASH_DENOMINATIONS[bisect_left(self.CASH_DENOMINATIONS, bill_total):])
         
-        # Add combinations for common scenarios
+        # Add next round hundred for common scenarios
         if bill_total < 500:
-            if rounded_100 not in suggestions:
-                suggestions.append(rounded_100)
+            suggestions.add(int((bill_total // 100 + 1) * 100))
         
         # Add exact amount option
         if bill_total not in suggestions:
-            suggestions.insert(0, int(bill_total))
+            suggestions.add(int(bill_total))
         
         # Sort and limit
-        suggestions = sorted(set(suggestions))[:6]
+        return sorted(suggestions)[:6]
+    
+    def suggest_amounts_batch(self, bill_totals) -> List[List[int]]:
+        """
+        Get suggested cash amounts for many bill totals at once.
+        
+        Gives the same list per bill as get_suggested_amounts, with the
+        denomination search and rounding done as array operations over all
+        totals. For a single bill, get_suggested_amounts is cheaper.
+        """
+        totals = np.asarray(bill_totals, dtype=np.float64)
+        denoms = self._DENOMINATIONS_ARRAY
+        
+        starts = np.searchsorted(denoms, totals, side='left')
+        rounded_100 = ((totals // 100 + 1) * 100).astype(np.int64)
+        exact = totals.astype(np.int64)
+        # The only note that can equal the bill is the first one covering it
+        on_note = denoms[np.minimum(starts, len(denoms) - 1)] == totals
+        below_500 = totals < 500
         
-        return suggestions
+        results = []
+        for start, hundred, amount, is_note, add_hundred in zip(
+                starts.tolist(), rounded_100.tolist(), exact.tolist(), on_note.tolist(), below_500.tolist()):
+            suggestions = set(self.CASH_DENOMINATIONS[start:])
+            if add_hundred:
+                suggestions.add(hundred)
+            if not is_note:
+                suggestions.add(amount)
+            results.append(sorted(suggestions)[:6])
+        return results
     
     def generate_upi_payment_string(self, 
                                     amount: float, 
@@ -127,34 +198,25 @@ class PaymentHandler:
         Generate UPI payment string for QR code.
         Format: upi://pay?pa=<VPA>&pn=<Name>&am=<Amount>&tn=<Note>&cu=INR
         """
-        # Use configured UPI or default
-        upi_id = merchant_upi or getattr(config, 'MERCHANT_UPI_ID', 'merchant@upi')
-        merchant_name = getattr(config, 'COMPANY_NAME', 'Store').replace(' ', '%20')
+        # Use configured UPI (prefix built once) or the given one
+        prefix = _build_upi_prefix(merchant_upi) if merchant_upi else _UPI_PREFIX
         
-        payment_string = (
-            f"upi://pay?"
-            f"pa={upi_id}&"
-            f"pn={merchant_name}&"
-            f"am={amount:.2f}&"
-            f"tn=Bill%20{bill_no}&"
-            f"cu=INR"
-        )
-        
-        return payment_string
+        return f"{prefix}am={amount:.2f}&tn=Bill%20{bill_no}&cu=INR"
     
     def validate_upi_amount(self, amount: float, is_special_category: bool = False) -> tuple[bool, str]:
         """
         Validate UPI payment amount against NPCI 2026 limits.
         """
-        limit = self.UPI_MEDICAL_LIMIT if is_special_category else self.UPI_DAILY_LIMIT
-        
         if amount <= 0:
-            return False, "Amount must be greater than zero"
+            return self._UPI_NOT_POSITIVE
         
-        if amount > limit:
-            return False, f"Amount exceeds UPI limit of ₹{limit:,.2f}"
+        if is_special_category:
+            if amount > self.UPI_MEDICAL_LIMIT:
+                return self._UPI_OVER_MEDICAL
+        elif amount > self.UPI_DAILY_LIMIT:
+            return self._UPI_OVER_DAILY
         
-        return True, "Valid"
+        return self._UPI_VALID
     
     def process_cash_payment(self, 
                             bill_id: int, 
@@ -273,18 +335,18 @@ class PaymentHandler:
                 'error': f'Total payments (₹{total_paid:.2f}) less than bill (₹{bill_total:.2f})'
             }
         
-        transactions = []
-        
-        for payment in payments:
-            transaction = PaymentTransaction(
+        transactions = [
+            PaymentTransaction(
                 payment_method=payment['method'],
                 amount=payment['amount'],
                 reference=payment.get('reference'),
                 metadata=payment.get('metadata', {})
             )
-            
-            self._save_payment_transaction(bill_id, transaction)
-            transactions.append(transaction.to_dict())
+            for payment in payments
+        ]
+        
+        # All parts of the split are saved in one transaction
+        self._save_payment_transactions(bill_id, transactions)
         
         change = total_paid - bill_total if total_paid > bill_total else 0
         
@@ -294,45 +356,47 @@ class PaymentHandler:
             'total_paid': total_paid,
             'bill_total': bill_total,
             'change': change,
-            'transactions': transactions
+            'transactions': [transaction.to_dict() for transaction in transactions]
         }
     
     def _save_payment_transaction(self, bill_id: int, transaction: PaymentTransaction):
         """Save payment transaction to database."""
-        try:
-            query = """
-                INSERT INTO payment_transactions 
-                (bill_id, payment_method, amount, payment_reference, payment_status, metadata, payment_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            self.db.execute_update(query, (
+        self._save_payment_transactions(bill_id, [transaction])
+    
+    def _save_payment_transactions(self, bill_id: int, transactions: List[PaymentTransaction]):
+        """Save several payment transactions for a bill with one executemany and commit."""
+        params = [
+            (
                 bill_id,
                 transaction.payment_method,
                 transaction.amount,
                 transaction.reference,
                 transaction.status,
-                json.dumps(transaction.metadata),
-                transaction.timestamp.isoformat()
-            ))
+                json.dumps(transaction.metadata, separators=(',', ':')),
+                transaction.timestamp_iso
+            )
+            for transaction in transactions
+        ]
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.executemany(self._INSERT_PAYMENT_SQL, params)
         except Exception as e:
             print(f"Error saving payment transaction: {e}")
             # Continue even if save fails - payment was successful
     
     def get_bill_payments(self, bill_id: int) -> List[Dict]:
         """Get all payments for a bill."""
-        query = """
-            SELECT * FROM payment_transactions 
-            WHERE bill_id = ? 
-            ORDER BY payment_timestamp
-        """
-        
         try:
-            results = self.db.execute_query(query, (bill_id,))
-            return [dict(row) for row in results]
+            # execute_query already returns dicts; copying them again doubled the work
+            return self.db.execute_query(self._BILL_PAYMENTS_SQL, (bill_id,))
         except Exception as e:
             print(f"Error getting bill payments: {e}")
             return []
+    
+    def iter_bill_payments(self, bill_id: int) -> Iterator[Dict]:
+        """Stream payments for a bill without materializing the whole list."""
+        for row in self.db.iter_query(self._BILL_PAYMENTS_SQL, (bill_id,)):
+            yield dict(row)
 
 
 def create_payment_tables():
@@ -6,11 +6,17 @@ from typing import List, Optional, Dict
 from src.database.connection import DatabaseConnection
 from datetime import datetime, timedelta
 import json
+import time
 
 
 class PendingBill:
     """Represents a pending/held transaction."""
     
+    __slots__ = (
+        'pending_id', 'employee_id', 'customer_name', 'customer_phone', '_cart_items', '_cart_items_json',
+        '_items_count', 'subtotal', 'discount', 'tax_rate', 'created_at', 'created_at_ts'
+    )
+    
     def __init__(self,
                  pending_id: int = None,
                  employee_id: int = None,
@@ -20,16 +26,43 @@ class PendingBill:
                  subtotal: float = 0,
                  discount: float = 0,
                  tax_rate: float = 18,
-                 created_at: datetime = None):
+                 created_at: datetime = None,
+                 cart_items_json: str = None,
+                 items_count: int = None):
         self.pending_id = pending_id
         self.employee_id = employee_id
         self.customer_name = customer_name
         self.customer_phone = customer_phone
-        self.cart_items = cart_items or []
+        # Bills loaded from the database keep the raw JSON until the cart is opened
+        if cart_items is None and not cart_items_json:
+            cart_items = []
+        self._cart_items = cart_items
+        self._cart_items_json = cart_items_json
+        self._items_count = items_count
         self.subtotal = subtotal
         self.discount = discount
         self.tax_rate = tax_rate
         self.created_at = created_at or datetime.now()
+        self.created_at_ts = self.created_at.timestamp()
+    
+    @property
+    def cart_items(self) -> List[Dict]:
+        """Cart lines, parsed from the stored JSON on first access."""
+        if self._cart_items is None:
+            self._cart_items = json.loads(self._cart_items_json)
+        return self._cart_items
+    
+    @cart_items.setter
+    def cart_items(self, items: List[Dict]):
+        self._cart_items = items
+        self._items_count = None
+    
+    @property
+    def items_count(self) -> int:
+        """Number of cart lines, without parsing the cart when it was stored with the bill."""
+        if self._items_count is not None:
+            return self._items_count
+        return len(self.cart_items)
     
     def to_dict(self) -> Dict:
         return {
@@ -65,18 +98,22 @@ class PendingBill:
             created_at=created_at
         )
     
-    def get_age_minutes(self) -> int:
-        """Get how many minutes this bill has been pending."""
-        if self.created_at:
-            delta = datetime.now() - self.created_at
-            return int(delta.total_seconds() / 60)
-        return 0
+    def get_age_minutes(self, now_ts: float = None) -> int:
+        """
+        Get how many minutes this bill has been pending.
+        
+        Args:
+            now_ts: Current time from time.time(); pass one value when rendering a list of bills
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        return int((now_ts - self.created_at_ts) / 60)
     
-    def get_display_text(self) -> str:
+    def get_display_text(self, now_ts: float = None) -> str:
         """Get display text for the pending bill."""
-        items_count = len(self.cart_items)
+        items_count = self.items_count
         name = self.customer_name or self.customer_phone or f"Bill #{self.pending_id}"
-        age = self.get_age_minutes()
+        age = self.get_age_minutes(now_ts)
         return f"{name} - {items_count} items (₹{self.subtotal:.2f}) - {age}m ago"
 
 
@@ -88,10 +125,61 @@ class PendingBillsManager:
     
     MAX_PENDING_BILLS = 10
     EXPIRY_HOURS = 4  # Auto-expire after 4 hours
+    SWEEP_INTERVAL = 300  # Seconds between deletes of expired bills
+    
+    _INSERT_SQL = """
+        INSERT INTO pending_bills 
+        (employee_id, customer_name, customer_phone, customer_phone_rev, cart_items, items_count,
+         subtotal, discount, tax_rate, expires_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    _BY_EMPLOYEE_SQL = """
+        SELECT * FROM pending_bills 
+        WHERE employee_id = ? AND expires_at > ?
+        ORDER BY created_at DESC
+    """
+    _BY_ID_SQL = "SELECT * FROM pending_bills WHERE pending_id = ?"
+    _SEARCH_PHONE_SQL = """
+        SELECT * FROM pending_bills 
+        WHERE employee_id = ? AND customer_phone_rev LIKE ?
+        ORDER BY created_at DESC
+    """
+    _RECALL_SQL = "DELETE FROM pending_bills WHERE pending_id = ? RETURNING *"
+    _DELETE_SQL = "DELETE FROM pending_bills WHERE pending_id = ? RETURNING employee_id"
+    _COUNTS_SQL = "SELECT employee_id, COUNT(*) as count FROM pending_bills GROUP BY employee_id"
+    # expires_at holds local datetime.isoformat() values, so it is compared with the same
+    _CLEANUP_SQL = "DELETE FROM pending_bills WHERE expires_at < ?"
     
     def __init__(self):
         self.db = DatabaseConnection()
         self._ensure_table_exists()
+        # Pending bills per employee, kept in step with every save/delete
+        self._counts: Dict[int, int] = {}
+        self._load_counts()
+        self._last_sweep: Optional[float] = None
+    
+    @staticmethod
+    def _bill_from_row(row) -> PendingBill:
+        """Build a PendingBill from a pending_bills row."""
+        created_at = None
+        if row['created_at']:
+            try:
+                created_at = datetime.fromisoformat(row['created_at'])
+            except:
+                created_at = datetime.now()
+        
+        return PendingBill(
+            pending_id=row['pending_id'],
+            employee_id=row['employee_id'],
+            customer_name=row['customer_name'],
+            customer_phone=row['customer_phone'],
+            subtotal=row['subtotal'] or 0,
+            discount=row['discount'] or 0,
+            tax_rate=row['tax_rate'] or 18,
+            created_at=created_at,
+            cart_items_json=row['cart_items'],
+            items_count=row['items_count']
+        )
     
     def _ensure_table_exists(self):
         """Create pending_bills table if it doesn't exist."""
@@ -107,11 +195,42 @@ class PendingBillsManager:
                 tax_rate REAL DEFAULT 18,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 expires_at DATETIME,
+                items_count INTEGER,
+                customer_phone_rev TEXT,
                 FOREIGN KEY (employee_id) REFERENCES employee(employee_id)
             )
         """
         try:
             self.db.execute_update(create_sql)
+            
+            # Tables created before items_count existed get it added and backfilled
+            columns = [row['name'] for row in self.db.execute_query("PRAGMA table_info(pending_bills)")]
+            if 'items_count' not in columns:
+                with self.db.get_cursor() as cursor:
+                    cursor.execute("ALTER TABLE pending_bills ADD COLUMN items_count INTEGER")
+                    cursor.execute("UPDATE pending_bills SET items_count = json_array_length(cart_items)")
+            
+            # Reversed phone numbers turn "ends with these digits" into an indexable prefix match
+            if 'customer_phone_rev' not in columns:
+                with self.db.get_cursor() as cursor:
+                    cursor.execute("ALTER TABLE pending_bills ADD COLUMN customer_phone_rev TEXT")
+                    cursor.execute("SELECT pending_id, customer_phone FROM pending_bills WHERE customer_phone IS NOT NULL")
+                    cursor.executemany(
+                        "UPDATE pending_bills SET customer_phone_rev = ? WHERE pending_id = ?",
+                        [(phone[::-1], pending_id) for pending_id, phone in cursor.fetchall()]
+                    )
+            
+            # Per-employee listing walks the index in created_at order; cleanup range-scans expires_at
+            with self.db.get_cursor() as cursor:
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_pending_emp_created ON pending_bills(employee_id, created_at DESC)"
+                )
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_pending_expires ON pending_bills(expires_at)")
+                # LIKE can only seek an index built with NOCASE (LIKE is case-insensitive)
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_pending_phone_rev "
+                    "ON pending_bills(employee_id, customer_phone_rev COLLATE NOCASE)"
+                )
         except Exception as e:
             print(f"Note: Could not create pending_bills table: {e}")
     
@@ -136,108 +255,48 @@ class PendingBillsManager:
             return None
         
         expires_at = datetime.now() + timedelta(hours=self.EXPIRY_HOURS)
-        cart_json = json.dumps(cart_items)
-        
-        query = """
-            INSERT INTO pending_bills 
-            (employee_id, customer_name, customer_phone, cart_items, subtotal, discount, tax_rate, expires_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
+        cart_json = json.dumps(cart_items, separators=(',', ':'))
         
         try:
-            self.db.execute_update(query, (
+            # last_insert_rowid() is per connection, so take it from the insert itself
+            pending_id = self.db.execute_insert(self._INSERT_SQL, (
                 employee_id,
                 customer_name,
                 customer_phone,
+                customer_phone[::-1] if customer_phone else None,
                 cart_json,
+                len(cart_items),
                 subtotal,
                 discount,
                 tax_rate,
                 expires_at.isoformat()
             ))
-            
-            # Get the inserted ID
-            result = self.db.execute_query("SELECT last_insert_rowid() as id")
-            if result:
-                return result[0]['id']
-            return None
+            if pending_id:
+                self._counts[employee_id] = self._counts.get(employee_id, 0) + 1
+            return pending_id or None
         except Exception as e:
             print(f"Error saving pending bill: {e}")
             return None
     
     def get_pending_bills(self, employee_id: int) -> List[PendingBill]:
         """Get all pending bills for an employee."""
-        # Clean up expired bills first
-        self._cleanup_expired()
-        
-        query = """
-            SELECT * FROM pending_bills 
-            WHERE employee_id = ?
-            ORDER BY created_at DESC
-        """
+        # Expired bills are filtered out here and only deleted every SWEEP_INTERVAL
+        self._maybe_sweep()
         
         try:
-            results = self.db.execute_query(query, (employee_id,))
-            
-            pending_bills = []
-            for row in results:
-                cart_items = json.loads(row['cart_items']) if row['cart_items'] else []
-                
-                created_at = None
-                if row['created_at']:
-                    try:
-                        created_at = datetime.fromisoformat(row['created_at'])
-                    except:
-                        created_at = datetime.now()
-                
-                bill = PendingBill(
-                    pending_id=row['pending_id'],
-                    employee_id=row['employee_id'],
-                    customer_name=row['customer_name'],
-                    customer_phone=row['customer_phone'],
-                    cart_items=cart_items,
-                    subtotal=row['subtotal'] or 0,
-                    discount=row['discount'] or 0,
-                    tax_rate=row['tax_rate'] or 18,
-                    created_at=created_at
-                )
-                pending_bills.append(bill)
-            
-            return pending_bills
+            results = self.db.execute_query(self._BY_EMPLOYEE_SQL, (employee_id, datetime.now().isoformat()))
+            # Reconcile the counter with what is actually stored
+            self._counts[employee_id] = len(results)
+            return [self._bill_from_row(row) for row in results]
         except Exception as e:
             print(f"Error getting pending bills: {e}")
             return []
     
     def get_pending_bill(self, pending_id: int) -> Optional[PendingBill]:
         """Get a specific pending bill by ID."""
-        query = "SELECT * FROM pending_bills WHERE pending_id = ?"
-        
         try:
-            results = self.db.execute_query(query, (pending_id,))
-            
-            if results:
-                row = results[0]
-                cart_items = json.loads(row['cart_items']) if row['cart_items'] else []
-                
-                created_at = None
-                if row['created_at']:
-                    try:
-                        created_at = datetime.fromisoformat(row['created_at'])
-                    except:
-                        created_at = datetime.now()
-                
-                return PendingBill(
-                    pending_id=row['pending_id'],
-                    employee_id=row['employee_id'],
-                    customer_name=row['customer_name'],
-                    customer_phone=row['customer_phone'],
-                    cart_items=cart_items,
-                    subtotal=row['subtotal'] or 0,
-                    discount=row['discount'] or 0,
-                    tax_rate=row['tax_rate'] or 18,
-                    created_at=created_at
-                )
-            return None
+            results = self.db.execute_query(self._BY_ID_SQL, (pending_id,))
+            return self._bill_from_row(results[0]) if results else None
         except Exception as e:
             print(f"Error getting pending bill: {e}")
             return None
@@ -247,19 +306,28 @@ class PendingBillsManager:
         Recall a pending bill (get and delete).
         Returns the bill data for loading into cart.
         """
-        bill = self.get_pending_bill(pending_id)
-        
-        if bill:
-            self.delete_pending_bill(pending_id)
-        
-        return bill
+        # One DELETE ... RETURNING reads and removes the bill in a single write,
+        # so a bill can never be recalled twice
+        try:
+            with self.db.get_cursor() as cursor:
+                cursor.execute(self._RECALL_SQL, (pending_id,))
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            self._decrement_count(row['employee_id'])
+            return self._bill_from_row(row)
+        except Exception as e:
+            print(f"Error recalling pending bill: {e}")
+            return None
     
     def delete_pending_bill(self, pending_id: int) -> bool:
         """Delete a pending bill."""
-        query = "DELETE FROM pending_bills WHERE pending_id = ?"
-        
         try:
-            self.db.execute_update(query, (pending_id,))
+            with self.db.get_cursor() as cursor:
+                cursor.execute(self._DELETE_SQL, (pending_id,))
+                row = cursor.fetchone()
+            if row is not None:
+                self._decrement_count(row['employee_id'])
             return True
         except Exception as e:
             print(f"Error deleting pending bill: {e}")
@@ -267,20 +335,33 @@ class PendingBillsManager:
     
     def get_pending_count(self, employee_id: int) -> int:
         """Get count of pending bills for an employee."""
-        query = "SELECT COUNT(*) as count FROM pending_bills WHERE employee_id = ?"
-        
+        return self._counts.get(employee_id, 0)
+    
+    def _decrement_count(self, employee_id: int):
+        """Record that one of an employee's pending bills was removed."""
+        if self._counts.get(employee_id, 0) > 0:
+            self._counts[employee_id] -= 1
+    
+    def _load_counts(self):
+        """Load pending bill counts for all employees in one query."""
         try:
-            results = self.db.execute_query(query, (employee_id,))
-            return results[0]['count'] if results else 0
-        except:
-            return 0
+            results = self.db.execute_query(self._COUNTS_SQL)
+            self._counts = {row['employee_id']: row['count'] for row in results}
+        except Exception as e:
+            print(f"Error counting pending bills: {e}")
+    
+    def _maybe_sweep(self):
+        """Remove expired pending bills if the last sweep was over SWEEP_INTERVAL ago."""
+        now = time.monotonic()
+        if self._last_sweep is None or now - self._last_sweep > self.SWEEP_INTERVAL:
+            self._last_sweep = now
+            self._cleanup_expired()
     
     def _cleanup_expired(self):
         """Remove expired pending bills."""
-        query = "DELETE FROM pending_bills WHERE expires_at < datetime('now')"
-        
         try:
-            self.db.execute_update(query)
+            if self.db.execute_update(self._CLEANUP_SQL, (datetime.now().isoformat(),)):
+                self._load_counts()
         except:
             pass
     
@@ -289,32 +370,9 @@ class PendingBillsManager:
         if not phone_digits:
             return []
         
-        query = """
-            SELECT * FROM pending_bills 
-            WHERE employee_id = ? AND customer_phone LIKE ?
-            ORDER BY created_at DESC
-        """
-        
         try:
-            results = self.db.execute_query(query, (employee_id, f'%{phone_digits}'))
-            
-            pending_bills = []
-            for row in results:
-                cart_items = json.loads(row['cart_items']) if row['cart_items'] else []
-                
-                bill = PendingBill(
-                    pending_id=row['pending_id'],
-                    employee_id=row['employee_id'],
-                    customer_name=row['customer_name'],
-                    customer_phone=row['customer_phone'],
-                    cart_items=cart_items,
-                    subtotal=row['subtotal'] or 0,
-                    discount=row['discount'] or 0,
-                    tax_rate=row['tax_rate'] or 18
-                )
-                pending_bills.append(bill)
-            
-            return pending_bills
+            results = self.db.execute_query(self._SEARCH_PHONE_SQL, (employee_id, f'{phone_digits[::-1]}%'))
+            return [self._bill_from_row(row) for row in results]
         except Exception as e:
             print(f"Error searching pending bills: {e}")
             return []
@@ -8,39 +8,51 @@ from src.database.connection import DatabaseConnection
 class ProductTypeService:
     """Service class for product type operations."""
     
+    _ALL_SQL = "SELECT * FROM product_types ORDER BY display_order, type_name"
+    _ACTIVE_SQL = "SELECT * FROM product_types WHERE is_active = 1 ORDER BY display_order, type_name"
+    _BY_ID_SQL = "SELECT * FROM product_types WHERE product_type_id = ?"
+    _SEARCH_SQL = """
+        SELECT * FROM product_types 
+        WHERE type_name LIKE ? OR hsn_code LIKE ?
+        ORDER BY display_order, type_name
+    """
+    _INSERT_SQL = """
+        INSERT INTO product_types (type_name, hsn_code, display_order, is_active)
+        VALUES (?, ?, ?, ?)
+    """
+    _UPDATE_SQL = """
+        UPDATE product_types
+        SET type_name = ?, hsn_code = ?, display_order = ?, is_active = ?
+        WHERE product_type_id = ?
+    """
+    _DEACTIVATE_SQL = """
+        UPDATE product_types SET is_active = 0
+        WHERE product_type_id = ?
+          AND NOT EXISTS (SELECT 1 FROM products WHERE products.product_type_id = product_types.product_type_id)
+    """
+    
     def __init__(self):
         self.db = DatabaseConnection()
     
     def get_all_product_types(self) -> List[Dict]:
         """Get all product types ordered by display order."""
-        query = "SELECT * FROM product_types ORDER BY display_order, type_name"
-        return self.db.execute_query(query)
+        return self.db.execute_query(self._ALL_SQL)
     
     def get_product_type_by_id(self, type_id: int) -> Optional[Dict]:
         """Get product type by ID."""
-        query = "SELECT * FROM product_types WHERE product_type_id = ?"
-        results = self.db.execute_query(query, (type_id,))
+        results = self.db.execute_query(self._BY_ID_SQL, (type_id,))
         return results[0] if results else None
     
     def search_product_types(self, search_term: str) -> List[Dict]:
         """Search product types by name or HSN code."""
-        query = """
-            SELECT * FROM product_types 
-            WHERE type_name LIKE ? OR hsn_code LIKE ?
-            ORDER BY display_order, type_name
-        """
         search_pattern = f"%{search_term}%"
-        return self.db.execute_query(query, (search_pattern, search_pattern))
+        return self.db.execute_query(self._SEARCH_SQL, (search_pattern, search_pattern))
     
     def add_product_type(self, type_data: Dict) -> bool:
         """Add a new product type."""
         try:
-            query = """
-                INSERT INTO product_types (type_name, hsn_code, display_order, is_active)
-                VALUES (?, ?, ?, ?)
-            """
             self.db.execute_insert(
-                query,
+                self._INSERT_SQL,
                 (
                     type_data['type_name'],
                     type_data.get('hsn_code', ''),
@@ -56,13 +68,8 @@ class ProductTypeService:
     def update_product_type(self, type_id: int, type_data: Dict) -> bool:
         """Update an existing product type."""
         try:
-            query = """
-                UPDATE product_types
-                SET type_name = ?, hsn_code = ?, display_order = ?, is_active = ?
-                WHERE product_type_id = ?
-            """
             self.db.execute_update(
-                query,
+                self._UPDATE_SQL,
                 (
                     type_data['type_name'],
                     type_data.get('hsn_code', ''),
@@ -82,17 +89,10 @@ class ProductTypeService:
         Only allows deletion if no products use this type.
         """
         try:
-            # Check if products use this type
-            check_query = "SELECT COUNT(*) as count FROM products WHERE product_type_id = ?"
-            result = self.db.execute_query(check_query, (type_id,))
-            
-            if result and result[0]['count'] > 0:
-                print(f"Cannot delete: {result[0]['count']} products use this type")
+            # Soft delete, in the same statement that checks no products use this type
+            if self.db.execute_update(self._DEACTIVATE_SQL, (type_id,)) != 1:
+                print("Cannot delete: product type not found or still used by products")
                 return False
-            
-            # Soft delete
-            query = "UPDATE product_types SET is_active = 0 WHERE product_type_id = ?"
-            self.db.execute_update(query, (type_id,))
             return True
         except Exception as e:
             print(f"Error deleting product type: {str(e)}")
@@ -100,5 +100,4 @@ class ProductTypeService:
     
     def get_active_product_types(self) -> List[Dict]:
         """Get only active product types."""
-        query = "SELECT * FROM product_types WHERE is_active = 1 ORDER BY display_order, type_name"
-        return self.db.execute_query(query)
+        return self.db.execute_query(self._ACTIVE_SQL)
@@ -2,56 +2,161 @@
 Smart Search Module for simple barcode-based products.
 Provides fast product search with caching.
 """
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from src.database.connection import DatabaseConnection
 import time
 from difflib import SequenceMatcher
 
+import numpy as np
+
+from src.logic._fast import group_codes
+
+
+class _TrieNode:
+    """Prefix trie node; ids are cache indices of products under this prefix, in cache order."""
+    
+    __slots__ = ('children', 'ids')
+    
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.ids: List[int] = []
+
 
 class SmartSearch:
     """Fast product search using simple_products table."""
     
+    # Fuzzy scores below this are not search results
+    MIN_SCORE = 0.3
+    
+    # Category matches count for half as much as name or barcode matches
+    CATEGORY_WEIGHT = 0.5
+    
+    # Digit-only queries at least this long are treated as scanned barcodes
+    MIN_BARCODE_LENGTH = 6
+    
+    # Score arrays of recent fuzzy queries kept for reuse
+    SCORE_CACHE_SIZE = 32
+    
+    # Column order is unpacked positionally in _load_cache
+    _LOAD_SQL = """
+        SELECT id, barcode, name, mrp, cost_price, stock, category
+        FROM simple_products
+        WHERE is_active = 1
+        ORDER BY name
+    """
+    
     def __init__(self):
         self.db = DatabaseConnection()
         self._cache: List[Dict] = []
+        self._cache_snapshot: Tuple[Dict, ...] = ()
+        self._search_texts: List[str] = []
+        # Lowercased name and barcode columns, kept out of the product dicts returned to callers
+        self._names_lower: List[str] = []
+        self._barcodes_lower: List[str] = []
+        # Per cached product: (lowercased text, matcher, weight) for name and barcode
+        self._search_fields: List[Tuple[Tuple[str, SequenceMatcher, float], ...]] = []
+        # Categories repeat across products, so each distinct one is scored once per
+        # search: (lowercased text, matcher) per category, and each product's category code
+        self._category_fields: List[Tuple[str, SequenceMatcher]] = []
+        self._category_codes = np.empty(0, dtype=np.int64)
+        # Recent query -> _query_scores result, valid until the cache reloads
+        self._score_cache: Dict[str, np.ndarray] = {}
+        # Instant search indexes: lowercased barcode -> first cache index, and a
+        # prefix trie over lowercased names and barcodes
+        self._barcode_index: Dict[str, int] = {}
+        self._trie = _TrieNode()
+        # Stock column of the cache, so search can boost scores without per-row dict lookups
+        self._stocks = np.empty(0, dtype=np.int64)
         self._cache_time: float = 0
+        self._cache_version = -1  # db.write_version the cache was loaded at
         self._cache_ttl: int = 60  # 1 minute cache
+        self._cache_rows: List[tuple] = None  # Rows the cache was last built from
     
     def _load_cache(self, force: bool = False):
         """Load products into cache."""
-        now = time.time()
-        if not force and self._cache and (now - self._cache_time) < self._cache_ttl:
+        now = time.monotonic()
+        # Writes through this process bump write_version, so the TTL only has to
+        # catch changes made by other processes
+        if (not force and self._cache and self._cache_version == self.db.write_version
+                and (now - self._cache_time) < self._cache_ttl):
             return
+        self._cache_version = self.db.write_version
         
-        query = """
-            SELECT id, barcode, name as product_name, mrp, cost_price, stock, category
-            FROM simple_products
-            WHERE is_active = 1
-            ORDER BY name
-        """
+        results = self.db.execute_query_rows(self._LOAD_SQL)
         
-        results = self.db.execute_query(query)
+        # Periodic reloads usually find nothing changed; keep the built indexes then
+        if results == self._cache_rows:
+            self._cache_time = now
+            return
+        self._cache_rows = results
         
-        self._cache = []
-        for row in results:
-            self._cache.append({
-                'product_id': row['id'],
-                'barcode': row['barcode'] or '',
-                'product_name': row['product_name'],
-                'mrp': row['mrp'] or 0.0,
-                'cost_price': row.get('cost_price', 0.0) or 0.0,
-                'stock': row['stock'] or 0,
-                'category': row.get('category', ''),
-                'search_text': f"{row['product_name']} {row['barcode']} {row.get('category', '')}".lower()
-            })
+        self._cache = [
+            {
+                'product_id': product_id,
+                'barcode': barcode or '',
+                'product_name': name,
+                'mrp': mrp or 0.0,
+                'cost_price': cost_price or 0.0,
+                'stock': stock or 0,
+                'category': category,
+                'search_text': f"{name} {barcode} {category}".lower()
+            }
+            for product_id, barcode, name, mrp, cost_price, stock, category in results
+        ]
+        self._cache_snapshot = tuple(self._cache)
+        # search_text column on its own, for the contains scan in search_instant
+        self._search_texts = [p['search_text'] for p in self._cache]
+        self._names_lower = [p['product_name'].lower() for p in self._cache]
+        self._barcodes_lower = [p['barcode'].lower() for p in self._cache]
+        self._score_cache = {}
+        
+        # Matchers index each text once (SequenceMatcher caches its second sequence);
+        # a search only swaps in the query
+        self._search_fields = [
+            tuple(
+                (text, SequenceMatcher(None, '', text), weight)
+                for text, weight in ((name, 1.0), (barcode, 1.0))
+            )
+            for name, barcode in zip(self._names_lower, self._barcodes_lower)
+        ]
+        self._category_codes, categories = group_codes([(p['category'] or '').lower() for p in self._cache])
+        self._category_fields = [(text, SequenceMatcher(None, '', text)) for text in categories]
+        self._stocks = np.fromiter((p['stock'] for p in self._cache), dtype=np.int64, count=len(self._cache))
+        self._build_instant_index()
         
         self._cache_time = now
     
+    def _build_instant_index(self):
+        """Index cached products by barcode and by every prefix of their name and barcode."""
+        self._barcode_index = {}
+        self._trie = _TrieNode()
+        for index, (name, barcode) in enumerate(zip(self._names_lower, self._barcodes_lower)):
+            self._barcode_index.setdefault(barcode, index)
+            for key in (name, barcode):
+                node = self._trie
+                self._add_trie_id(node, index)
+                for char in key:
+                    node = node.children.setdefault(char, _TrieNode())
+                    self._add_trie_id(node, index)
+    
+    @staticmethod
+    def _add_trie_id(node: _TrieNode, index: int):
+        """Record a product under a trie node once, even if its name and barcode share the prefix."""
+        # Products are indexed in cache order, so a repeat can only be the last id
+        if not node.ids or node.ids[-1] != index:
+            node.ids.append(index)
+    
+    def _prefix_ids(self, query: str) -> List[int]:
+        """Cache indices of products whose name or barcode starts with query."""
+        node = self._trie
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.ids
+    
     def _match_score(self, query: str, text: str) -> float:
-        """Calculate match score."""
-        query = query.lower()
-        text = text.lower()
-        
+        """Calculate match score of an already-lowercased query and text."""
         if query == text:
             return 1.0
         if text.startswith(query):
@@ -61,6 +166,52 @@ class SmartSearch:
         
         return SequenceMatcher(None, query, text).ratio()
     
+    def _field_score(self, query: str, text: str, matcher: SequenceMatcher, weight: float) -> float:
+        """
+        Weighted _match_score of one cached field.
+        
+        Returns 0.0 instead when the matcher's cheap upper bounds show the score
+        cannot reach MIN_SCORE, skipping the full ratio() computation.
+        """
+        if query == text:
+            return weight
+        if text.startswith(query):
+            return 0.95 * weight
+        if query in text:
+            return 0.8 * weight
+        
+        matcher.set_seq1(query)
+        if (matcher.real_quick_ratio() * weight < self.MIN_SCORE or
+                matcher.quick_ratio() * weight < self.MIN_SCORE):
+            return 0.0
+        return matcher.ratio() * weight
+    
+    def _query_scores(self, query: str) -> np.ndarray:
+        """
+        Best field score of every cached product for query, before stock boosting.
+        
+        Recent queries are memoized until the cache reloads, so retyping or
+        backspacing to an earlier query skips the fuzzy scoring.
+        """
+        scores = self._score_cache.pop(query, None)
+        if scores is None:
+            field_score = self._field_score
+            scores = np.fromiter(
+                (max(field_score(query, text, matcher, weight) for text, matcher, weight in fields)
+                 for fields in self._search_fields),
+                dtype=np.float64, count=len(self._search_fields)
+            )
+            if len(scores):
+                category_scores = np.array([
+                    self._field_score(query, text, matcher, self.CATEGORY_WEIGHT)
+                    for text, matcher in self._category_fields
+                ])
+                scores = np.maximum(scores, category_scores[self._category_codes])
+            if len(self._score_cache) >= self.SCORE_CACHE_SIZE:
+                self._score_cache.pop(next(iter(self._score_cache)))
+        self._score_cache[query] = scores
+        return scores
+    
     def search(self, query: str, limit: int = 10) -> List[Dict]:
         """Search products with fuzzy matching."""
         if not query or not query.strip():
@@ -69,25 +220,32 @@ class SmartSearch:
         query = query.strip().lower()
         self._load_cache()
         
-        results = []
-        for product in self._cache:
-            score = max(
-                self._match_score(query, product['product_name']),
-                self._match_score(query, product['barcode']),
-                self._match_score(query, product.get('category', '')) * 0.5
-            )
-            
-            if score >= 0.3:
-                # Boost in-stock items
-                if product['stock'] > 0:
-                    score *= 1.1
-                else:
-                    score *= 0.5
-                
-                results.append({**product, 'score': score})
-        
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:limit]
+        # Scanned barcodes are answered from the barcode map without fuzzy scoring
+        if query.isdigit() and len(query) >= self.MIN_BARCODE_LENGTH and limit > 0:
+            index = self._barcode_index.get(query)
+            if index is not None:
+                product = self._cache[index]
+                return [{**product, 'score': 1.1 if product['stock'] > 0 else 0.5}]
+        
+        scores = self._query_scores(query)
+        matched = np.flatnonzero(scores >= self.MIN_SCORE)
+        if limit <= 0 or not len(matched):
+            return []
+        
+        # Boost in-stock items
+        boosted = scores[matched] * np.where(self._stocks[matched] > 0, 1.1, 0.5)
+        
+        # Partition out the top scores, keeping every tie with the cut-off score so the
+        # stable sort below orders equal scores by cache position, as a full sort would
+        if limit < len(boosted):
+            cutoff = np.partition(boosted, len(boosted) - limit)[len(boosted) - limit]
+            keep = np.flatnonzero(boosted >= cutoff)
+        else:
+            keep = np.arange(len(boosted))
+        top = keep[np.argsort(-boosted[keep], kind='stable')][:limit]
+        
+        # Result dicts are only built for the returned products
+        return [{**self._cache[matched[i]], 'score': float(boosted[i])} for i in top]
     
     def search_instant(self, query: str, limit: int = 5) -> List[Dict]:
         """Fast search for autocomplete."""
@@ -97,26 +255,22 @@ class SmartSearch:
         query = query.strip().lower()
         self._load_cache()
         
-        results = []
-        
         # First: exact barcode match
-        for p in self._cache:
-            if p['barcode'].lower() == query:
-                return [p]  # Exact barcode match, return immediately
-        
-        # Second: prefix matches
-        for p in self._cache:
-            if (p['product_name'].lower().startswith(query) or
-                p['barcode'].lower().startswith(query)):
-                results.append(p)
-                if len(results) >= limit:
-                    break
-        
-        # Third: contains matches
+        index = self._barcode_index.get(query)
+        if index is not None:
+            return [self._cache[index]]  # Exact barcode match, return immediately
+        
+        # Second: prefix matches, straight from the trie
+        found = self._prefix_ids(query)[:limit]
+        results = [self._cache[i] for i in found]
+        
+        # Third: contains matches (only this step still scans the cache)
         if len(results) < limit:
-            for p in self._cache:
-                if p not in results and query in p['search_text']:
-                    results.append(p)
+            seen = set(found)
+            cache = self._cache
+            for i, text in enumerate(self._search_texts):
+                if query in text and i not in seen:
+                    results.append(cache[i])
                     if len(results) >= limit:
                         break
         
@@ -129,9 +283,14 @@ class SmartSearch:
         """Find product by exact barcode."""
         self._load_cache()
         
-        for p in self._cache:
-            if p['barcode'] == barcode:
-                return p
+        index = self._barcode_index.get(barcode.lower())
+        if index is not None and self._cache[index]['barcode'] == barcode:
+            return self._cache[index]
+        # Barcodes differing only in case share a map entry; fall back to a scan for those
+        if index is not None:
+            for p in self._cache:
+                if p['barcode'] == barcode:
+                    return p
         
         # Fallback to DB if not in cache
         query = "SELECT * FROM simple_products WHERE barcode = ? AND is_active = 1"
@@ -155,10 +314,15 @@ class SmartSearch:
         """Force refresh cache."""
         self._load_cache(force=True)
     
-    def get_all_products(self) -> List[Dict]:
-        """Get all products."""
+    def get_all_products(self) -> Tuple[Dict, ...]:
+        """
+        Get all products.
+        
+        Returns the same read-only snapshot until the cache reloads, so callers
+        must not modify the product dicts.
+        """
         self._load_cache()
-        return self._cache.copy()
+        return self._cache_snapshot
 
 
 class QuickAccessManager:
@@ -0,0 +1,31 @@
+"""
+__slots__ support for dataclasses on Python 3.9.
+Equivalent to @dataclass(slots=True), which needs Python 3.10.
+"""
+import dataclasses
+
+
+def add_slots(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields, dropping the per-instance __dict__.
+    
+    Apply above @dataclass. Field defaults already live in the generated __init__,
+    so the class attributes holding them are removed to make room for the slots.
+    
+    Args:
+        cls: Dataclass to rebuild
+    
+    Returns:
+        type: New class with the same name, bases and methods
+    """
+    field_names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict = dict(cls.__dict__)
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__slots__'] = field_names
+    
+    slotted = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
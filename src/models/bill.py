@@ -5,7 +5,10 @@ from dataclasses import dataclass, field
 from typing import List, Optional
 from datetime import datetime
 
+from src.models._slots import add_slots
 
+
+@add_slots
 @dataclass
 class BillItem:
     """Represents a single item in a bill."""
@@ -28,6 +31,7 @@ class BillItem:
         }
 
 
+@add_slots
 @dataclass
 class Bill:
     """Bill model representing a customer invoice."""
@@ -45,17 +49,24 @@ class Bill:
     bill_details: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    # Running subtotal after each item, in item order; in sync with items only
+    # while its length matches
+    _running_subtotals: List[float] = field(default_factory=list, init=False, repr=False, compare=False)
     
     def add_item(self, item: BillItem):
         """Add an item to the bill."""
+        in_sync = len(self._running_subtotals) == len(self.items)
         self.items.append(item)
-        self._recalculate()
+        # Only the new item needs adding onto an up-to-date running subtotal
+        self._resum_from(len(self.items) - 1 if in_sync else 0)
     
     def remove_item(self, index: int):
         """Remove an item from the bill."""
         if 0 <= index < len(self.items):
+            in_sync = len(self._running_subtotals) == len(self.items)
             self.items.pop(index)
-            self._recalculate()
+            # Sums before the removed item still hold, so undoing the last scan is O(1)
+            self._resum_from(index if in_sync else 0)
     
     def calculate_subtotal(self) -> float:
         """Calculate subtotal from all items."""
@@ -86,7 +97,24 @@ class Bill:
     
     def _recalculate(self):
         """Recalculate all amounts."""
-        self.subtotal = self.calculate_subtotal()
+        self._resum_from(0)
+    
+    def _resum_from(self, index: int):
+        """
+        Redo the running subtotals from item index onwards, then tax and total.
+        Items are added in the same order as calculate_subtotal, so the result is identical.
+        """
+        running = self._running_subtotals
+        del running[index:]
+        subtotal = running[-1] if running else 0
+        for item in self.items[index:]:
+            subtotal += item.get_total()
+            running.append(subtotal)
+        self.subtotal = subtotal
+        self._update_totals()
+    
+    def _update_totals(self):
+        """Recalculate tax and total from the current subtotal."""
         self.tax_amount = self.calculate_tax()
         self.total = self.calculate_total()
     
@@ -122,20 +150,23 @@ class Bill:
         Returns:
             Bill: Bill instance
         """
+        # Optional columns are checked against one set instead of a fresh keys() list each
+        keys = frozenset(row.keys())
+        
         return cls(
             bill_no=row['bill_no'],
             date=row['date'],
             customer_name=row['customer_name'],
-            customer_no=row['customer_no'] if 'customer_no' in row.keys() else '',
+            customer_no=row['customer_no'] if 'customer_no' in keys else '',
             items=[],  # Items are stored as text, need to be parsed separately
-            subtotal=row['subtotal'] if 'subtotal' in row.keys() else 0.0,
-            discount=row['discount'] if 'discount' in row.keys() else 0.0,
-            tax_rate=row['tax_rate'] if 'tax_rate' in row.keys() else 18.0,
-            tax_amount=row['tax_amount'] if 'tax_amount' in row.keys() else 0.0,
-            total=row['total'] if 'total' in row.keys() else 0.0,
-            bill_details=row['bill_details'] if 'bill_details' in row.keys() else '',
-            created_at=row['created_at'] if 'created_at' in row.keys() else None,
-            updated_at=row['updated_at'] if 'updated_at' in row.keys() else None
+            subtotal=row['subtotal'] if 'subtotal' in keys else 0.0,
+            discount=row['discount'] if 'discount' in keys else 0.0,
+            tax_rate=row['tax_rate'] if 'tax_rate' in keys else 18.0,
+            tax_amount=row['tax_amount'] if 'tax_amount' in keys else 0.0,
+            total=row['total'] if 'total' in keys else 0.0,
+            bill_details=row['bill_details'] if 'bill_details' in keys else '',
+            created_at=row['created_at'] if 'created_at' in keys else None,
+            updated_at=row['updated_at'] if 'updated_at' in keys else None
         )
     
     def to_dict(self) -> dict:
@@ -2,10 +2,23 @@
 Employee data model.
 """
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 import hashlib
+import hmac
+import os
 
+from src.models._slots import add_slots
+from src.utils.validators import digits_only
 
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+
+# Stored format: pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+_PBKDF2_SCHEME = 'pbkdf2_sha256'
+_PBKDF2_ITERATIONS = 100_000
+
+
+@add_slots
 @dataclass
 class Employee:
     """Employee model representing an employee in the system."""
@@ -23,6 +36,12 @@ class Employee:
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     
+    # Column order expected by from_rows_bulk
+    DB_COLUMNS = (
+        'emp_id', 'name', 'password', 'role', 'contact_num',
+        'address', 'designation', 'aadhar_number', 'created_at', 'updated_at'
+    )
+    
     def get_full_name(self) -> str:
         """Get employee's full name."""
         return f"{self.first_name} {self.last_name}"
@@ -34,7 +53,7 @@ class Employee:
     @staticmethod
     def hash_password(password: str) -> str:
         """
-        Hash a password for storage.
+        Hash a password for storage with salted PBKDF2-HMAC-SHA256.
         
         Args:
             password: Plain text password
@@ -42,7 +61,14 @@ class Employee:
         Returns:
             str: Hashed password
         """
-        return hashlib.sha256(password.encode()).hexdigest()
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, _PBKDF2_ITERATIONS)
+        return f"{_PBKDF2_SCHEME}${_PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+    
+    def needs_rehash(self) -> bool:
+        """Check if the stored password predates the current hashing scheme."""
+        scheme, _, rest = (self.password or '').partition('$')
+        return scheme != _PBKDF2_SCHEME or not rest.startswith(f"{_PBKDF2_ITERATIONS}$")
     
     def verify_password(self, password: str) -> bool:
         """
@@ -54,20 +80,40 @@ class Employee:
         Returns:
             bool: True if password matches
         """
-        # For backward compatibility, check both hashed and plain text
-        hashed = self.hash_password(password)
-        return self.password == hashed or self.password == password
+        stored = self.password
+        if not stored:
+            return False
+        if stored.startswith(_PBKDF2_SCHEME + '$'):
+            try:
+                _, iterations, salt, digest = stored.split('$')
+                candidate = hashlib.pbkdf2_hmac(
+                    'sha256', password.encode(), bytes.fromhex(salt), int(iterations)
+                ).hex()
+            except ValueError:
+                return False
+            stored = digest
+        # For backward compatibility: unsalted SHA-256 hashes (64 lowercase hex
+        # digits) and legacy plain-text passwords
+        elif len(stored) == 64 and all(c in _HEX_DIGITS for c in stored):
+            candidate = hashlib.sha256(password.encode()).hexdigest()
+        else:
+            candidate = password
+        # Constant-time comparison, on bytes so non-ASCII passwords are accepted
+        return hmac.compare_digest(stored.encode(), candidate.encode())
     
     @classmethod
     def from_db_row(cls, row) -> 'Employee':
         """Create Employee instance from database row."""
+        # Column names looked up once; row.keys() builds a new list on every call
+        keys = frozenset(row.keys())
+        
         # Handle both old schema (name, contact_num) and new schema (first_name, last_name, contact_number)
         
         # Get name - try new schema first, fallback to old
-        if 'first_name' in row.keys():
+        if 'first_name' in keys:
             first_name = row['first_name'] or ''
             last_name = row['last_name'] or ''
-        elif 'name' in row.keys():
+        elif 'name' in keys:
             # Old schema - split name into first and last
             full_name = row['name'] or ''
             name_parts = full_name.split(' ', 1)
@@ -79,33 +125,67 @@ class Employee:
         
         # Get contact - try new schema first, fallback to old
         contact_number = ''
-        if 'contact_number' in row.keys():
+        if 'contact_number' in keys:
             contact_number = row['contact_number'] or ''
-        elif 'contact_num' in row.keys():
+        elif 'contact_num' in keys:
             contact_number = row['contact_num'] or ''
         
         # Get aadhar - handle different column names
         aadhar_number = None
-        if 'aadhar_number' in row.keys():
-            aadhar_number = row['aadhar_number']
-        elif 'aadhar_num' in row.keys():
-            aadhar_number = row['aadhar_num']
+        if 'aadhar_number' in keys:
+            aadhar_number = digits_only(row['aadhar_number'])
+        elif 'aadhar_num' in keys:
+            aadhar_number = digits_only(row['aadhar_num'])
         
         return cls(
             emp_id=row['emp_id'],
             first_name=first_name,
             last_name=last_name,
             password=row['password'],
-            role=row['role'] if 'role' in row.keys() else 'Employee',
+            role=row['role'] if 'role' in keys else 'Employee',
             contact_number=contact_number,
-            email=row['email'] if 'email' in row.keys() else None,
-            address=row['address'] if 'address' in row.keys() else None,
-            designation=row['designation'] if 'designation' in row.keys() else None,
+            email=row['email'] if 'email' in keys else None,
+            address=row['address'] if 'address' in keys else None,
+            designation=row['designation'] if 'designation' in keys else None,
             aadhar_number=aadhar_number,
-            created_at=row['created_at'] if 'created_at' in row.keys() else None,
-            updated_at=row['updated_at'] if 'updated_at' in row.keys() else None
+            created_at=row['created_at'] if 'created_at' in keys else None,
+            updated_at=row['updated_at'] if 'updated_at' in keys else None
         )
     
+    @classmethod
+    def from_rows_bulk(cls, rows) -> List['Employee']:
+        """
+        Create Employee instances from rows selected in DB_COLUMNS order.
+        Unpacks each row positionally and skips the per-row column checks
+        of from_db_row.
+        
+        Args:
+            rows: Iterable of rows (tuples or sqlite3.Row) in DB_COLUMNS order
+        
+        Returns:
+            List of Employee objects
+        """
+        employees = []
+        for (emp_id, name, password, role, contact_num, address,
+             designation, aadhar_number, created_at, updated_at) in rows:
+            first_name, _, last_name = (name or '').partition(' ')
+            
+            employee = cls.__new__(cls)
+            employee.emp_id = emp_id
+            employee.first_name = first_name
+            employee.last_name = last_name
+            employee.password = password
+            employee.role = role
+            employee.contact_number = contact_num or ''
+            employee.email = None
+            employee.address = address
+            employee.designation = designation
+            employee.aadhar_number = digits_only(aadhar_number)
+            employee.created_at = created_at
+            employee.updated_at = updated_at
+            employees.append(employee)
+        return employees
+    
     def to_dict(self) -> dict:
         """Convert employee to dictionary."""
         return {
@@ -4,7 +4,11 @@ Product/Inventory data model for Namkeen Business.
 from dataclasses import dataclass
 from typing import Optional
 
+from src.models._slots import add_slots
+from src.utils.validators import digits_only
 
+
+@add_slots
 @dataclass
 class Product:
     """Product model for namkeen (snacks) inventory."""
@@ -75,14 +79,16 @@ class Product:
     @classmethod
     def from_db_row(cls, row) -> 'Product':
         """Create Product instance from database row."""
+        keys = frozenset(row.keys())
+        
         # Handle product_subcat for backward compatibility - ignore it
         # Map vendor_phn to supplier fields
         
         supplier_phone = None
-        if 'supplier_phone' in row.keys():
-            supplier_phone = row['supplier_phone']
-        elif 'vendor_phn' in row.keys():
-            supplier_phone = row['vendor_phn']
+        if 'supplier_phone' in keys:
+            supplier_phone = digits_only(row['supplier_phone'])
+        elif 'vendor_phn' in keys:
+            supplier_phone = digits_only(row['vendor_phn'])
         
         return cls(
             product_id=row['product_id'],
@@ -90,12 +96,12 @@ class Product:
             product_cat=row['product_cat'],
             stock=row['stock'],
             mrp=row['mrp'],
-            unit=row['unit'] if 'unit' in row.keys() else "Kg",
-            cost_price=row['cost_price'] if 'cost_price' in row.keys() else None,
-            supplier_name=row['supplier_name'] if 'supplier_name' in row.keys() else None,
+            unit=row['unit'] if 'unit' in keys else "Kg",
+            cost_price=row['cost_price'] if 'cost_price' in keys else None,
+            supplier_name=row['supplier_name'] if 'supplier_name' in keys else None,
             supplier_phone=supplier_phone,
-            created_at=row['created_at'] if 'created_at' in row.keys() else None,
-            updated_at=row['updated_at'] if 'updated_at' in row.keys() else None
+            created_at=row['created_at'] if 'created_at' in keys else None,
+            updated_at=row['updated_at'] if 'updated_at' in keys else None
         )
     
     def to_dict(self) -> dict:
@@ -104,11 +110,12 @@ class Product:
             'product_id': self.product_id,
             'product_name': self.product_name,
             'product_cat': self.product_cat,
-            'product_subcat': self.product_subcat,
             'stock': self.stock,
             'mrp': self.mrp,
+            'unit': self.unit,
             'cost_price': self.cost_price,
-            'vendor_phn': self.vendor_phn,
+            'supplier_name': self.supplier_name,
+            'supplier_phone': self.supplier_phone,
             'created_at': self.created_at,
             'updated_at': self.updated_at
         }
@@ -78,6 +78,12 @@ class ModernAnalyticsWindow(QMainWindow):
         subtitle.setStyleSheet(f"font-size: 18px; color: {self.text_gray}; margin-bottom: 20px;")
         main_layout.addWidget(subtitle)
         
+        # Inventory figures for the cards and stock charts, fetched together
+        try:
+            self.inventory_bundle = self.inventory.get_dashboard_bundle(low_stock_threshold=20)
+        except Exception:
+            self.inventory_bundle = {}
+        
         # Key Metrics Cards
         metrics_layout = QHBoxLayout()
         metrics_layout.setSpacing(20)
@@ -85,8 +91,8 @@ class ModernAnalyticsWindow(QMainWindow):
         try:
             daily_revenue = self.billing.calculate_daily_revenue(datetime.now().strftime("%Y-%m-%d"))
             today_bills = len(self.billing.get_todays_bills())
-            total_products = self.inventory.get_total_product_count()
-            stock_value = self.inventory.get_total_stock_value()
+            total_products = self.inventory_bundle['count']
+            stock_value = self.inventory_bundle['stock_value']
             
             metrics_layout.addWidget(self.create_metric_card("Today's Revenue", f"₹{daily_revenue:,.2f}", "Sales", "#10B981"))
             metrics_layout.addWidget(self.create_metric_card("Bills Today", str(today_bills), "Transactions", "#2563EB"))
@@ -236,13 +242,11 @@ class ModernAnalyticsWindow(QMainWindow):
         ax = fig.add_subplot(111)
         
         try:
-            dates = []
-            revenues = []
-            for i in range(6, -1, -1):
-                date = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-                revenue = self.billing.calculate_daily_revenue(date)
-                dates.append((datetime.now() - timedelta(days=i)).strftime("%d %b"))
-                revenues.append(revenue)
+            days = [datetime.now() - timedelta(days=i) for i in range(6, -1, -1)]
+            # One range query for the whole week instead of one per day
+            daily = self.billing.get_daily_revenues(days[0].strftime("%Y-%m-%d"), days[-1].strftime("%Y-%m-%d"))
+            dates = [day.strftime("%d %b") for day in days]
+            revenues = [daily.get(day.strftime("%Y-%m-%d"), 0.0) for day in days]
             
             self._setup_dark_chart(ax, '7-Day Revenue Trend', ylabel='Revenue (₹)')
             
@@ -270,7 +274,7 @@ class ModernAnalyticsWindow(QMainWindow):
         ax = fig.add_subplot(111)
         
         try:
-            categories = self.inventory.get_categories() or []
+            categories = self.inventory_bundle.get('categories') or []
             cat_counts = {}
             for cat in categories:
                 products = self.inventory.get_products_by_category(cat, None)
@@ -309,7 +313,7 @@ class ModernAnalyticsWindow(QMainWindow):
         ax = fig.add_subplot(111)
         
         try:
-            low_stock = self.inventory.get_low_stock_products(threshold=20)
+            low_stock = self.inventory_bundle.get('low_stock')
             if low_stock:
                 names = [p.product_name[:15] for p in low_stock[:8]]
                 stocks = [p.stock for p in low_stock[:8]]
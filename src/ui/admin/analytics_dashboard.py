@@ -14,7 +14,7 @@ from PySide6.QtGui import QFont, QColor, QBrush
 from datetime import datetime, timedelta
 
 from src.logic.analytics_engine import AnalyticsEngine, DateRange, KPICalculator
-from src.logic.chart_builder import ChartBuilder, ChartTheme
+from src.logic.chart_builder import ChartBuilder, ChartTheme, FigureCanvas
 
 
 # =============================================================================
@@ -370,6 +370,40 @@ class DataTable(QTableWidget):
                 self.setItem(row_idx, col_idx, item)
 
 
+# =============================================================================
+# CHART PLACEMENT
+# =============================================================================
+
+def _show_chart(layout: QVBoxLayout, title: str, canvas: FigureCanvas):
+    """
+    Show a chart canvas under its title in a chart container.
+    
+    ChartBuilder hands back the same canvas for a chart on every update, so
+    when it is already in place the title label and canvas widget are kept
+    and Qt does not have to rebuild the container's layout.
+    
+    Args:
+        layout: Container layout holding the title label and the canvas
+        title: Title text shown above the chart
+        canvas: Canvas returned by a ChartBuilder build/update method
+    """
+    if layout.count() == 2 and layout.itemAt(1).widget() is canvas:
+        return
+    
+    while layout.count():
+        widget = layout.takeAt(0).widget()
+        if isinstance(widget, FigureCanvas):
+            # Chart canvases are cached by ChartBuilder and may be re-added
+            widget.setParent(None)
+        elif widget:
+            widget.deleteLater()
+    
+    title_label = QLabel(title)
+    title_label.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
+    layout.addWidget(title_label)
+    layout.addWidget(canvas)
+
+
 # =============================================================================
 # ANALYTICS TAB WIDGETS
 # =============================================================================
@@ -447,50 +481,25 @@ class SalesTab(QWidget):
     
     def update_data(self, data: dict):
         """Update tab with new data."""
-        # Clear existing charts
-        self._clear_layout(self.trend_layout)
-        self._clear_layout(self.type_layout)
-        self._clear_layout(self.brand_layout)
-        self._clear_layout(self.top_layout)
-        
         # Revenue trend
-        trend_title = QLabel("📈 Revenue Trend")
-        trend_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.trend_layout.addWidget(trend_title)
-        trend_chart = self.charts.build_revenue_trend(data.get('trend', []))
-        self.trend_layout.addWidget(trend_chart)
+        trend_chart = self.charts.update_revenue_trend(data.get('trend', []))
+        _show_chart(self.trend_layout, "📈 Revenue Trend", trend_chart)
         
         # Sales by type
-        type_title = QLabel("📂 Sales by Type")
-        type_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.type_layout.addWidget(type_title)
         type_chart = self.charts.build_sales_by_type(data.get('by_type', []))
-        self.type_layout.addWidget(type_chart)
+        _show_chart(self.type_layout, "📂 Sales by Type", type_chart)
         
         # Sales by brand
-        brand_title = QLabel("🏷️ Sales by Brand")
-        brand_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.brand_layout.addWidget(brand_title)
         brand_chart = self.charts.build_sales_by_brand(data.get('by_brand', []))
-        self.brand_layout.addWidget(brand_chart)
+        _show_chart(self.brand_layout, "🏷️ Sales by Brand", brand_chart)
         
         # Top products chart
-        top_title = QLabel("🏆 Top Products")
-        top_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.top_layout.addWidget(top_title)
         top_chart = self.charts.build_top_products_chart(data.get('top_products', []))
-        self.top_layout.addWidget(top_chart)
+        _show_chart(self.top_layout, "🏆 Top Products", top_chart)
         
         # Products table
         products = data.get('top_products', [])
         self.products_table.populate(products, ['product_name', 'quantity', 'revenue'])
-    
-    def _clear_layout(self, layout):
-        """Clear all widgets from a layout."""
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
 
 
 class InventoryTab(QWidget):
@@ -553,22 +562,13 @@ class InventoryTab(QWidget):
     
     def update_data(self, data: dict):
         """Update tab with new data."""
-        self._clear_layout(self.status_layout)
-        self._clear_layout(self.dist_layout)
-        
         # Stock status
-        status_title = QLabel("📊 Stock Status")
-        status_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.status_layout.addWidget(status_title)
         status_chart = self.charts.build_stock_status_bars(data.get('kpis', {}))
-        self.status_layout.addWidget(status_chart)
+        _show_chart(self.status_layout, "📊 Stock Status", status_chart)
         
         # Distribution
-        dist_title = QLabel("📦 Stock Distribution")
-        dist_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.dist_layout.addWidget(dist_title)
         dist_chart = self.charts.build_stock_distribution_pie(data.get('by_type', []))
-        self.dist_layout.addWidget(dist_chart)
+        _show_chart(self.dist_layout, "📦 Stock Distribution", dist_chart)
         
         # Low stock table
         low_stock = data.get('low_stock', [])
@@ -576,12 +576,6 @@ class InventoryTab(QWidget):
             low_stock, 
             ['product_name', 'variant_name', 'stock_quantity', 'reorder_level', 'stock_status']
         )
-    
-    def _clear_layout(self, layout):
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
 
 
 class ProfitabilityTab(QWidget):
@@ -644,22 +638,13 @@ class ProfitabilityTab(QWidget):
     
     def update_data(self, data: dict):
         """Update tab with new data."""
-        self._clear_layout(self.product_layout)
-        self._clear_layout(self.category_layout)
-        
         # Profit by product
-        prod_title = QLabel("💰 Profit by Product")
-        prod_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.product_layout.addWidget(prod_title)
         prod_chart = self.charts.build_profit_by_product(data.get('by_product', []))
-        self.product_layout.addWidget(prod_chart)
+        _show_chart(self.product_layout, "💰 Profit by Product", prod_chart)
         
         # Profit by category
-        cat_title = QLabel("📂 Profit by Category")
-        cat_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.category_layout.addWidget(cat_title)
         cat_chart = self.charts.build_profit_by_category(data.get('by_category', []))
-        self.category_layout.addWidget(cat_chart)
+        _show_chart(self.category_layout, "📂 Profit by Category", cat_chart)
         
         # Table
         products = data.get('by_product', [])
@@ -667,12 +652,6 @@ class ProfitabilityTab(QWidget):
             products,
             ['product_name', 'revenue', 'cost', 'profit', 'margin_percent']
         )
-    
-    def _clear_layout(self, layout):
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
 
 
 class SupplierTab(QWidget):
@@ -735,36 +714,21 @@ class SupplierTab(QWidget):
     
     def update_data(self, data: dict):
         """Update tab with new data."""
-        self._clear_layout(self.perf_layout)
-        self._clear_layout(self.lead_layout)
-        
         performance = data.get('performance', [])
         
         # Performance chart
-        perf_title = QLabel("📊 Products per Supplier")
-        perf_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.perf_layout.addWidget(perf_title)
         perf_chart = self.charts.build_supplier_performance(performance)
-        self.perf_layout.addWidget(perf_chart)
+        _show_chart(self.perf_layout, "📊 Products per Supplier", perf_chart)
         
         # Lead time chart
-        lead_title = QLabel("⏱️ Lead Times")
-        lead_title.setStyleSheet(f"color: {TEXT_PRIMARY}; font-size: 14px; font-weight: bold; border: none;")
-        self.lead_layout.addWidget(lead_title)
         lead_chart = self.charts.build_lead_time_chart(performance)
-        self.lead_layout.addWidget(lead_chart)
+        _show_chart(self.lead_layout, "⏱️ Lead Times", lead_chart)
         
         # Table
         self.supplier_table.populate(
             performance,
             ['supplier_name', 'product_count', 'avg_unit_cost', 'avg_lead_time', 'rating']
         )
-    
-    def _clear_layout(self, layout):
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
 
 
 # =============================================================================
@@ -231,7 +231,7 @@ class AdminDashboard(QMainWindow):
             pass
         
         try:
-            employees = len(self.employee_service.get_all_employees())
+            employees = self.employee_service.get_employee_kpis()['total']
             self.employees_card.findChild(QLabel, "value").setText(str(employees))
         except:
             pass
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from src.logic.employee_mgmt import EmployeeService
 from src.models.employee import Employee
+from src.ui.workers import start_task
 from src.ui.dark_theme import get_dark_stylesheet, PRIMARY, SUCCESS, DANGER, TEXT_WHITE, TEXT_GRAY
 
 
@@ -18,6 +19,7 @@ class EmployeeWindow(QMainWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.employee_service = EmployeeService()
+        self._save_worker = None  # Employee save running on the thread pool, if any
         self.setup_ui()
         self.load_employees()
     
@@ -120,19 +122,40 @@ class EmployeeWindow(QMainWindow):
         """Add new employee."""
         dialog = EmployeeDialog(self)
         if dialog.exec():
-            employee = dialog.get_employee()
-            if self.employee_service.add_employee(employee):
-                QMessageBox.information(self, "Success", "Employee added")
-                self.load_employees()
+            self._save_employee(self.employee_service.add_employee, dialog.get_employee(),
+                                dialog.get_new_password(), "Employee added")
     
     def edit_employee(self, employee: Employee):
         """Edit employee."""
         dialog = EmployeeDialog(self, employee)
         if dialog.exec():
-            updated = dialog.get_employee()
-            if self.employee_service.update_employee(updated):
-                QMessageBox.information(self, "Success", "Employee updated")
+            self._save_employee(self.employee_service.update_employee, dialog.get_employee(),
+                                dialog.get_new_password(), "Employee updated")
+    
+    def _save_employee(self, save, employee: Employee, new_password: str, message: str):
+        """
+        Hash a newly entered password and save the employee on the thread pool.
+        
+        Args:
+            save: EmployeeService.add_employee or update_employee
+            employee: Employee from the dialog
+            new_password: Plain-text password typed in the dialog, or '' to keep the current one
+            message: Shown once the save succeeded
+        """
+        def task():
+            if new_password:
+                employee.password = Employee.hash_password(new_password)
+            return save(employee)
+        
+        def on_finished(saved):
+            self._save_worker = None
+            self.setEnabled(True)
+            if saved:
+                QMessageBox.information(self, "Success", message)
                 self.load_employees()
+        
+        self.setEnabled(False)
+        self._save_worker = start_task(task, on_finished=on_finished)
     
     def delete_employee(self, employee: Employee):
         """Delete employee."""
@@ -215,19 +238,21 @@ class EmployeeDialog(QDialog):
         self.setLayout(layout)
     
     def get_employee(self) -> Employee:
-        """Get employee from form."""
-        password = self.password_input.text()
-        if self.employee and not password:
-            password = self.employee.password
-        elif password:
-            password = Employee.hash_password(password)
-        
+        """
+        Get employee from form.
+        The password is the stored hash when editing; a newly typed password
+        comes from get_new_password() and is hashed by the caller.
+        """
         return Employee(
             emp_id=self.id_input.text(),
             first_name=self.first_name_input.text(),
             last_name=self.last_name_input.text(),
-            password=password,
+            password=self.employee.password if self.employee else '',
             role=self.role_combo.currentText(),
             contact_number=self.contact_input.text(),
             email=self.email_input.text() if self.email_input.text() else None
         )
+    
+    def get_new_password(self) -> str:
+        """Get the plain-text password typed in the form, or '' if none was entered."""
+        return self.password_input.text()
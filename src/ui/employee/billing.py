@@ -12,6 +12,7 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QKeySequence, QShortcut, QColor
 from datetime import datetime
 from typing import List
+import time
 from src.models.employee import Employee
 from src.models.bill import Bill, BillItem
 from src.logic.inventory import InventoryService
@@ -854,8 +855,9 @@ class BillingWindow(QMainWindow):
         
         layout = QVBoxLayout(dialog)
         list_w = QListWidget()
+        now_ts = time.time()
         for b in pending:
-            list_w.addItem(b.get_display_text())
+            list_w.addItem(b.get_display_text(now_ts))
         layout.addWidget(list_w)
         
         btn_row = QHBoxLayout()
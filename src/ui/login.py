@@ -8,6 +8,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from src.logic.employee_mgmt import EmployeeService
 from src.models.employee import Employee
+from src.ui.workers import start_task
 from src.ui.dark_theme import get_dark_stylesheet, PRIMARY, TEXT_WHITE, CARD_BG, BORDER, TEXT_GRAY
 import config
 
@@ -20,6 +21,7 @@ class LoginWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.employee_service = EmployeeService()
+        self._auth_worker = None  # Login check running on the thread pool, if any
         self.setup_ui()
     
     def setup_ui(self):
@@ -160,6 +162,9 @@ class LoginWindow(QWidget):
     
     def handle_login(self):
         """Handle login."""
+        if self._auth_worker is not None:
+            return
+        
         emp_id = self.emp_id_input.text().strip()
         password = self.password_input.text()
         
@@ -173,7 +178,21 @@ class LoginWindow(QWidget):
             self.password_input.setFocus()
             return
         
-        employee = self.employee_service.authenticate(emp_id, password)
+        self._set_inputs_enabled(False)
+        # Verifying (and upgrading a legacy password) hashes with PBKDF2
+        self._auth_worker = start_task(self.employee_service.authenticate, emp_id, password,
+                                       on_finished=self._on_authenticated)
+    
+    def _set_inputs_enabled(self, enabled: bool):
+        """Lock the form while a login is being checked."""
+        for widget in (self.emp_id_input, self.password_input, self.login_btn,
+                       self.admin_radio, self.employee_radio):
+            widget.setEnabled(enabled)
+    
+    def _on_authenticated(self, employee):
+        """Finish a login once the worker has checked the password."""
+        self._auth_worker = None
+        self._set_inputs_enabled(True)
         
         if employee:
             is_admin_role = employee.is_admin()
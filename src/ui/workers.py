@@ -0,0 +1,53 @@
+"""
+Thread pool helpers for work that would stall the UI thread.
+Password hashing is PBKDF2, which takes tens of milliseconds per hash.
+"""
+from typing import Callable
+
+from PySide6.QtCore import Signal, QObject, QRunnable, QThreadPool
+
+
+class _TaskSignals(QObject):
+    """Signals of TaskWorker; QRunnable itself cannot emit."""
+    
+    finished = Signal(object)  # Return value of the task, or None if it raised
+
+
+class TaskWorker(QRunnable):
+    """
+    Run a function on a pool thread and hand its result back to the UI thread.
+    
+    Keep a reference to the worker until finished fires.
+    """
+    
+    def __init__(self, task: Callable, *args):
+        super().__init__()
+        self.signals = _TaskSignals()
+        self.task = task
+        self.args = args
+    
+    def run(self):
+        try:
+            result = self.task(*self.args)
+        except Exception as e:
+            print(f"Error in background task: {e}")
+            result = None
+        self.signals.finished.emit(result)
+
+
+def start_task(task: Callable, *args, on_finished: Callable) -> TaskWorker:
+    """
+    Start task(*args) on the global thread pool.
+    
+    Args:
+        task: Function to run off the UI thread
+        *args: Arguments for task
+        on_finished: Called on the UI thread with the task's result
+    
+    Returns:
+        TaskWorker: The started worker
+    """
+    worker = TaskWorker(task, *args)
+    worker.signals.finished.connect(on_finished)
+    QThreadPool.globalInstance().start(worker)
+    return worker
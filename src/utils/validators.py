@@ -2,10 +2,13 @@
 Input validation utilities.
 """
 import re
-from typing import Tuple
+from typing import Optional, Tuple
 import config
 
 
+_NON_DIGITS = re.compile(r'[^0-9]+')
+
+
 def validate_phone(phone: str) -> Tuple[bool, str]:
     """
     Validate Indian phone number.
@@ -46,6 +49,21 @@ def validate_aadhar(aadhar: str) -> Tuple[bool, str]:
     return True, ""
 
 
+def digits_only(value) -> Optional[str]:
+    """
+    Canonicalize a phone or Aadhar number to its digits.
+    
+    Args:
+        value: Stored value, possibly with spaces, dashes or a leading '+'
+    
+    Returns:
+        str: ASCII digits only, or None if value is None or has no digits
+    """
+    if value is None:
+        return None
+    return _NON_DIGITS.sub('', str(value)) or None
+
+
 def validate_email(email: str) -> Tuple[bool, str]:
     """
     Validate email address.